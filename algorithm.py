@@ -0,0 +1,199 @@
+""" Compiled move sequences (algorithms) in standard Rubik's Cube notation """
+
+import re
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+from move_tables import MOVES, compose, invert
+
+ALGORITHM_CACHE_SIZE = 1024
+MAX_NESTING = 64 # Bracket depth allowed, so parsing and expanding never run out of stack
+MAX_MOVES = 1_000_000 # Moves an algorithm may expand to when its move list is asked for
+QUARTER_TURNS = {"": 1, "2": 2, "'": 3}
+NOTATIONS = {1: "", 2: "2", 3: "'"}
+TOKEN = re.compile(r"\s*(?:([(\[{])|([)\]}])(\d*)('?)|([,:])|(\d*[A-Za-z]w?)(['2]?)|(\S))")
+CLOSING = {"(": ")", "[": "]", "{": "}"}
+IDENTITY = compose()
+
+# An algorithm is parsed into a tree of nodes:
+#   ("move", base, quarter turns)
+#   ("sequence", [nodes])
+#   ("repeat", node, count)
+#   ("inverse", node)
+# Commutators [A, B] and conjugates [A: B] become sequences with inverse nodes that share A and B
+
+def tokenize(text):
+    """ Yields (open bracket, close bracket, repeat count, prime, separator, base, notation) per token """
+    for match in TOKEN.finditer(text.rstrip()):
+        (opening, closing, count, prime, separator, base, notation, invalid) = match.groups()
+        if invalid:
+            raise ValueError(f"Unexpected character '{invalid}'")
+        yield (opening, closing, count, prime, separator, base, notation)
+
+def parse_algorithm(text, moves=MOVES):
+    """ Parses notation into a tree (see above). Supports groups (A)n, commutators [A, B], conjugates [A: B],
+    inverses (A)' and nesting. A closing bracket may be followed by a repeat count and/or a prime.
+    moves holds the valid move names (by default those of the 3x3 cube; see nxn_cube.valid_move_names for other sizes) """
+    tokens = list(tokenize(text))
+    (node, position) = parse_sequence(tokens, 0, moves, 0)
+    if position < len(tokens):
+        (_, closing, _, _, separator, _, _) = tokens[position]
+        raise ValueError(f"Unmatched '{closing}'" if closing else f"Unexpected '{separator}' outside [ ]")
+    return node
+
+def parse_sequence(tokens, position, moves, depth):
+    """ Parses nodes up to the next closing bracket or separator, depth brackets deep. Returns (sequence node, position after it) """
+    nodes = []
+    while position < len(tokens):
+        (opening, closing, count, prime, separator, base, notation) = tokens[position]
+        if closing or separator:
+            break
+        if base:
+            if base + notation not in moves:
+                raise ValueError(f"'{base + notation}' is not a valid move")
+            nodes.append(("move", base, QUARTER_TURNS[notation]))
+            position += 1
+        else:
+            if depth == MAX_NESTING:
+                raise ValueError(f"Brackets are nested more than {MAX_NESTING} deep")
+            (node, position) = parse_group(tokens, position + 1, opening, moves, depth + 1)
+            nodes.append(node)
+    return (("sequence", nodes), position)
+
+def parse_group(tokens, position, opening, moves, depth):
+    """ Parses the inside of a bracket group, its closing bracket and suffix. Returns (node, position after it) """
+    (first, position) = parse_sequence(tokens, position, moves, depth)
+    separator = tokens[position][4] if position < len(tokens) else None
+    if separator:
+        if opening != "[":
+            raise ValueError(f"'{separator}' is only allowed inside [ ]")
+        (second, position) = parse_sequence(tokens, position + 1, moves, depth)
+        if position < len(tokens) and tokens[position][4]:
+            raise ValueError(f"Unexpected '{tokens[position][4]}': use nested brackets, e.g. [A, [B, C]]")
+        if separator == ",": # [A, B] = A B A' B'
+            node = ("sequence", [first, second, ("inverse", first), ("inverse", second)])
+        else: # [A: B] = A B A'
+            node = ("sequence", [first, second, ("inverse", first)])
+    else:
+        node = first
+    if position == len(tokens) or tokens[position][1] != CLOSING[opening]:
+        raise ValueError(f"Unmatched '{opening}'")
+    (_, _, count, prime, _, _, _) = tokens[position]
+    if count:
+        node = ("repeat", node, int(count))
+    if prime:
+        node = ("inverse", node)
+    return (node, position + 1)
+
+def expand_moves(node, inverted=False):
+    """ Lazily yields the (move base, quarter turns) of a parse tree in order, or of its inverse """
+    match node:
+        case ("move", base, quarter_turns):
+            yield (base, 4 - quarter_turns if inverted else quarter_turns)
+        case ("sequence", nodes):
+            for child in reversed(nodes) if inverted else nodes:
+                yield from expand_moves(child, inverted)
+        case ("repeat", child, count):
+            for _ in range(count):
+                yield from expand_moves(child, inverted)
+        case ("inverse", child):
+            yield from expand_moves(child, not inverted)
+
+def power(perm, exponent):
+    """ Returns perm applied exponent times, by repeated squaring """
+    ret = IDENTITY
+    while exponent:
+        if exponent & 1:
+            ret = compose(ret, perm)
+        perm = compose(perm, perm)
+        exponent >>= 1
+    return ret
+
+def node_permutation(node, cache=None):
+    """ Returns the net sticker permutation of a parse tree without expanding it: repeats use powers, inverses invert,
+    and subtrees shared by commutators and conjugates are computed once """
+    cache = {} if cache is None else cache
+    key = id(node)
+    if key not in cache:
+        match node:
+            case ("move", base, quarter_turns):
+                perm = MOVES[base + NOTATIONS[quarter_turns]]
+            case ("sequence", nodes):
+                perm = compose(*(node_permutation(child, cache) for child in nodes))
+            case ("repeat", child, count):
+                perm = power(node_permutation(child, cache), count)
+            case ("inverse", child):
+                perm = invert(node_permutation(child, cache))
+        cache[key] = perm
+    return cache[key]
+
+def parse_moves(text):
+    """ Parses text into the fully expanded list of (move base, quarter turns) """
+    return list(expand_moves(parse_algorithm(text)))
+
+def cancel_moves(moves):
+    """ Merges adjacent turns of the same layer: R R -> R2, R R' -> nothing, R2 R -> R' """
+    ret = []
+    for (base, quarter_turns) in moves:
+        if ret and ret[-1][0] == base:
+            quarter_turns = (ret.pop()[1] + quarter_turns) % 4
+        if quarter_turns:
+            ret.append((base, quarter_turns))
+    return ret
+
+class Algorithm:
+    """ A move sequence compiled into one net sticker permutation. The move list, with cancellations applied,
+    is only expanded when asked for """
+    def __init__(self, text="", moves=None, permutation=None, node=None):
+        if moves is not None:
+            node = ("sequence", [("move", base, quarter_turns) for (base, quarter_turns) in moves])
+        elif node is None:
+            node = parse_algorithm(text)
+        self.node = node
+        if permutation is None:
+            permutation = node_permutation(node)
+        self.permutation = permutation
+        self.gather = itemgetter(*permutation)
+        self._moves = None
+        self._inverse = None
+
+    @property
+    def moves(self):
+        if self._moves is None:
+            moves = list(islice(expand_moves(self.node), MAX_MOVES + 1))
+            if len(moves) > MAX_MOVES:
+                raise ValueError(f"Algorithm expands to more than {MAX_MOVES} moves")
+            self._moves = cancel_moves(moves)
+        return self._moves
+
+    def __repr__(self):
+        try:
+            return f"Algorithm('{self}')"
+        except ValueError:
+            return f"<Algorithm of more than {MAX_MOVES} moves>"
+
+    def __str__(self):
+        return " ".join(self.move_names())
+
+    def __len__(self):
+        return len(self.moves)
+
+    def move_names(self):
+        """ Returns the moves as a list of names accepted by RubiksCube.rotate_from_input """
+        return [base + NOTATIONS[quarter_turns] for (base, quarter_turns) in self.moves]
+
+    def inverse(self):
+        """ Returns the algorithm that undoes this one """
+        if self._inverse is None:
+            self._inverse = Algorithm(node=("inverse", self.node), permutation=invert(self.permutation))
+            self._inverse._inverse = self
+        return self._inverse
+
+    def apply(self, cube):
+        """ Applies the whole algorithm to cube as a single gather """
+        cube.apply_gather(self.gather)
+
+@lru_cache(maxsize=ALGORITHM_CACHE_SIZE)
+def compile_algorithm(text):
+    """ Returns the Algorithm for text, reusing it if the same text was compiled recently """
+    return Algorithm(text)
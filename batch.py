@@ -0,0 +1,46 @@
+""" Headless batch processing: JSON lines of (initial state, moves) in, JSON lines of results out """
+
+import json
+import time
+import cubie
+from rubiks_cube import RubiksCube
+
+def process_record(cube, record):
+    """ Runs one record on cube (reused between records) and returns the result dict.
+    A record is {"state": hex from RubiksCube.to_bytes (optional, default solved), "moves": notation (optional)} plus any "id" """
+    start = time.perf_counter()
+    result = {"id": record["id"]} if "id" in record else {}
+    try:
+        state = record.get("state")
+        if state:
+            cube.stickers[:] = cubie.decode_stickers(bytes.fromhex(state))
+        else:
+            cube.reset()
+        cube.apply_algorithm(record.get("moves", ""))
+        result.update(state=cube.to_bytes().hex(), solved=cube.is_solved())
+    except (ValueError, TypeError, AttributeError) as error:
+        result["error"] = str(error)
+    result["seconds"] = round(time.perf_counter() - start, 6)
+    return result
+
+def process_lines(lines):
+    """ Yields one result dict per non-empty input line, reading lazily so memory stays bounded """
+    cube = RubiksCube()
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as error:
+            yield {"error": f"Invalid JSON: {error}"}
+            continue
+        if not isinstance(record, dict):
+            yield {"error": "Each record must be a JSON object"}
+            continue
+        yield process_record(cube, record)
+
+def run(input_file, output_file):
+    """ Streams results for every record in input_file to output_file, one JSON line each """
+    write = output_file.write
+    for result in process_lines(input_file):
+        write(json.dumps(result) + "\n")
@@ -0,0 +1,100 @@
+""" Solve many scrambles in parallel. Worker processes share the memory-mapped solver tables """
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import solver
+from rubiks_cube import RubiksCube
+from tables import open_tables, write_tables
+
+CHUNK_SIZE = 16 # Scrambles sent to a worker at once, to keep inter-process overhead low
+CHUNKS_PER_WORKER = 4 # How many chunks may be queued per worker before waiting on results
+
+def ensure_table_file():
+    """ Writes the table file if there is none, so that workers map it instead of each building the tables. An existing
+    file is checked here, once, so a stale or corrupted file is reported plainly instead of failing every worker.
+    Raises ValueError """
+    path = solver.tables_path()
+    if os.path.exists(path):
+        open_tables(path, solver.TABLES_VERSION, verify=True)
+    else:
+        write_tables(path, solver.SolverTables.build().as_dict(), solver.TABLES_VERSION)
+
+def attach_tables():
+    """ Worker initializer: maps the shared table file once per process (ensure_table_file has checked it) """
+    solver.get_tables(verify=False)
+
+def solve_scramble(scramble, max_length=None, timeout=None):
+    """ Returns a result dict for one scramble, with the solve time in seconds. Errors are reported, not raised """
+    start = time.perf_counter()
+    result = {"scramble": scramble}
+    try:
+        cube = RubiksCube()
+        cube.apply_algorithm(scramble)
+        solution = solver.solve(cube, max_length, timeout)
+        result.update(solution=solution, length=len(solution.split()))
+    except (ValueError, TimeoutError) as error:
+        result["error"] = str(error)
+    result["seconds"] = round(time.perf_counter() - start, 6)
+    return result
+
+def solve_chunk(scrambles, max_length, timeout):
+    return [solve_scramble(scramble, max_length, timeout) for scramble in scrambles]
+
+def solve_scrambles(scrambles, workers=None, max_length=None, timeout=None):
+    """ Yields a result dict (see solve_scramble) for each scramble, in input order, as results become available.
+    scrambles may be any iterable (such as an open file); only a bounded window of it is held in memory """
+    ensure_table_file()
+    workers = workers or os.cpu_count()
+    scrambles = iter(scrambles)
+    with ProcessPoolExecutor(max_workers=workers, initializer=attach_tables) as executor:
+        pending = deque()
+        while True:
+            while len(pending) < workers * CHUNKS_PER_WORKER:
+                chunk = list(islice(scrambles, CHUNK_SIZE))
+                if not chunk:
+                    break
+                pending.append(executor.submit(solve_chunk, chunk, max_length, timeout))
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+def read_scrambles(file):
+    """ Yields the non-empty lines of file, stripped """
+    for line in file:
+        line = line.strip()
+        if line:
+            yield line
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve scrambles (one per line, in move notation) and write one JSON result per line")
+    parser.add_argument("input", help="scramble file, or - for stdin")
+    parser.add_argument("-o", "--output", help="result file (default: stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--max-length", type=int, default=None, help="accept the first solution of at most this many moves")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per scramble spent shortening the solution")
+    args = parser.parse_args()
+
+    input_file = sys.stdin if args.input == "-" else open(args.input)
+    output_file = open(args.output, "w") if args.output else sys.stdout
+    try:
+        ensure_table_file()
+    except ValueError as error:
+        parser.exit(1, f"{error}\n")
+    start = time.perf_counter()
+    count = 0
+    with input_file, output_file:
+        for result in solve_scrambles(read_scrambles(input_file), args.workers, args.max_length, args.timeout):
+            output_file.write(json.dumps(result) + "\n")
+            count += 1
+    elapsed = time.perf_counter() - start
+    print(f"Solved {count} scrambles in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.1f}/s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+""" Benchmarks for the cube engine, with JSON baselines and regression checks. Runs headless """
+
+import argparse
+import json
+import platform
+import sys
+import time
+from itertools import cycle
+
+from algorithm import Algorithm
+from enums import *
+from nxn_cube import NxNCube
+from rubiks_cube import RubiksCube
+from scramble import generate_scrambles
+
+SEED = 2024
+SAMPLE_SIZE = 100 # Operations per throughput sample, and per round of individually timed calls
+DEFAULT_DURATION = 0.5 # Seconds spent measuring each benchmark
+DEFAULT_THRESHOLD = 0.10 # Fractional ops/sec drop reported as a regression
+PERCENTILES = (50, 90, 99)
+
+class StubCanvas:
+    """ Stands in for tkinter.Canvas so drawing can be measured without a display """
+    def __init__(self):
+        self.items = 0
+
+    def create_polygon(self, *args, **kwargs):
+        self.items += 1
+        return self.items
+
+    def itemconfig(self, item, **kwargs):
+        pass
+
+    def delete(self, *items):
+        pass
+
+def scrambled_cube():
+    cube = RubiksCube()
+    cube.randomize(50, seed=SEED)
+    return cube
+
+def cycling(cube, method, arguments):
+    """ Returns an operation calling method on cube with each of arguments in turn """
+    arguments = cycle(arguments)
+    bound = getattr(cube, method)
+    return lambda: bound(*next(arguments))
+
+def sequence_operation(cube, moves):
+    """ One operation applies a whole move sequence through rotate_from_input """
+    def operation():
+        for move in moves:
+            cube.rotate_from_input(move)
+    return operation
+
+def randomize_operation():
+    cube = RubiksCube()
+    return lambda: cube.randomize(25)
+
+def parse_operation(texts):
+    texts = cycle(texts)
+    return lambda: Algorithm(next(texts))
+
+def draw_operation():
+    (cube, canvas) = (scrambled_cube(), StubCanvas())
+    return lambda: cube.draw(canvas)
+
+def redraw_operation():
+    from gui import StickerView # Imports tkinter, but needs no display. Raises ImportError without tkinter
+    (cube, canvas) = (scrambled_cube(), StubCanvas())
+    view = StickerView(canvas, cube)
+    moves = cycle(["R", "U", "F'", "x"])
+    def operation():
+        cube.rotate_from_input(next(moves))
+        view.draw()
+    return operation
+
+def benchmarks():
+    """ {name: (factory returning a zero-argument operation, description)}. Factories are called once before timing """
+    rotations = list(Rotation)
+    long_sequence = next(generate_scrambles(1, 1000, SEED, "all")).split()
+    parse_texts = list(generate_scrambles(64, 20, SEED, "all"))
+    return {
+        "rotate": (lambda: cycling(scrambled_cube(), "rotate", [(face, rotation) for face in Face for rotation in rotations]), "one face turn"),
+        "rotate_axis": (lambda: cycling(scrambled_cube(), "rotate_axis", [(axis, rotation) for axis in Axis for rotation in rotations]), "one slice turn"),
+        "view": (lambda: cycling(scrambled_cube(), "view", [(orientation, rotation) for orientation in Orientation for rotation in rotations]), "one whole-cube rotation"),
+        "double_turn": (lambda: cycling(scrambled_cube(), "double_turn", [(face, rotation) for face in Face for rotation in rotations]), "one wide turn"),
+        "rotate_from_input": (lambda: cycling(scrambled_cube(), "rotate_from_input", [(move,) for move in long_sequence]), "parse and apply one move"),
+        "sequence_1000": (lambda: sequence_operation(scrambled_cube(), long_sequence), "1000 random moves of every type"),
+        "sequence_1000_lazy": (lambda: sequence_operation(RubiksCube(lazy=True), long_sequence), "the same 1000 moves on a lazy cube"),
+        "is_solved": (lambda: scrambled_cube().is_solved, "is_solved on a scrambled cube"),
+        "is_solved_tracked": (lambda: RubiksCube(track_solved=True).is_solved, "is_solved with track_solved"),
+        "randomize": (randomize_operation, "25-move random scramble"),
+        "parse_algorithm": (lambda: parse_operation(parse_texts), "compile a 20-move algorithm, uncached"),
+        "nxn_7x7_layer": (lambda: cycling(NxNCube(7), "apply_move", [(move,) for move in ("3R", "2U'", "Rw", "4F2", "3Lw'", "D")]), "one 7x7 layer or block turn"),
+        "draw": (draw_operation, "draw to a stub canvas"),
+        "move_and_redraw": (redraw_operation, "one move, then recolor changed stickers (GUI path)"),
+    }
+
+def timer_overhead(rounds=1000):
+    """ Median cost (ns) of the two clock reads around a timed call """
+    clock = time.perf_counter_ns
+    costs = []
+    for _ in range(rounds):
+        start = clock()
+        costs.append(clock() - start)
+    costs.sort()
+    return costs[len(costs) // 2]
+
+def measure(operation, duration):
+    """ Times operation for about duration seconds. Throughput comes from samples of SAMPLE_SIZE calls timed together;
+    the percentiles are per-call latencies, from calls timed one by one, less the clock overhead """
+    clock = time.perf_counter_ns
+    overhead = timer_overhead()
+    (samples, latencies) = ([], [])
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline or len(samples) < 5:
+        start = clock()
+        for _ in range(SAMPLE_SIZE):
+            operation()
+        samples.append(clock() - start)
+        for _ in range(SAMPLE_SIZE):
+            start = clock()
+            operation()
+            latencies.append(clock() - start)
+    latencies.sort()
+    result = {"ops_per_sec": round(1e9 * SAMPLE_SIZE * len(samples) / sum(samples), 1), "samples": len(samples)}
+    for percentile in PERCENTILES:
+        latency = latencies[min(len(latencies) - 1, len(latencies) * percentile // 100)]
+        result[f"p{percentile}_ns"] = max(latency - overhead, 0)
+    return result
+
+def run(names=None, duration=DEFAULT_DURATION, output=sys.stdout):
+    """ Runs the selected benchmarks (all by default) and returns {name: result} """
+    available = benchmarks()
+    results = {}
+    for name in names or available:
+        (factory, description) = available[name]
+        try:
+            operation = factory()
+        except ImportError as error: # Such as the GUI benchmark without tkinter
+            print(f"{name:<20}skipped: {error}", file=output)
+            continue
+        results[name] = measure(operation, duration)
+        result = results[name]
+        print(f"{name:<20}{result['ops_per_sec']:>14,.0f} ops/s   per call: p50 {result['p50_ns']:>10,.0f} ns   p99 {result['p99_ns']:>10,.0f} ns   ({description})", file=output)
+    return results
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """ Returns [(name, baseline ops/sec, current ops/sec)] for every benchmark slower than baseline by more than threshold """
+    regressions = []
+    for name, result in results.items():
+        if name in baseline and result["ops_per_sec"] < baseline[name]["ops_per_sec"] * (1 - threshold):
+            regressions.append((name, baseline[name]["ops_per_sec"], result["ops_per_sec"]))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the cube engine")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run (default: all of {', '.join(benchmarks())})")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="seconds per benchmark (default: %(default)s)")
+    parser.add_argument("--save", metavar="FILE", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a saved baseline, exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed fractional slowdown (default: %(default)s)")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in benchmarks()]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    results = run(args.names, args.duration)
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "results": results}, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for (name, before, after) in regressions:
+            print(f"REGRESSION {name}: {before:,.0f} -> {after:,.0f} ops/s ({after / before - 1:+.1%})")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%}.")
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,56 @@
 """ The Rubik's Cube Block Class """
 
 import utilities
+from functools import lru_cache
+from types import MappingProxyType
 from enums import *
+from move_tables import STICKER_INDEX, SOLVED_STICKERS
+
+@lru_cache(maxsize=None)
+def position_layout(x, y, z):
+    """ Returns (block type, initial colors, sticker indices) of the block at (x, y, z). The mappings are read-only
+    and shared by the blocks of every cube, so a block only stores its coordinates and where its stickers live """
+    initial_colors = Block.compute_initial_colors(x, y, z)
+    sticker_indices = {face: STICKER_INDEX[((x, y, z), face)] for face in initial_colors}
+    return (BlockType(utilities.num_zeros_in_coordinates(x, y, z)), MappingProxyType(initial_colors), MappingProxyType(sticker_indices))
 
 class Block:
     """ Class representing a generic Rubik's Cube block """
-    def __init__(self, x, y, z):
+    __slots__ = ("x", "y", "z", "block_type", "initial_colors", "sticker_indices", "cube", "_stickers")
+
+    def __init__(self, x, y, z, stickers=None, cube=None):
         self.x = int(x)
         self.y = int(y)
         self.z = int(z)
-        self.block_type = BlockType(utilities.num_zeros_in_coordinates(x, y, z))
-        self.initial_colors = self.compute_initial_colors(x, y, z)
-        self.colors = self.initial_colors.copy()
+        (self.block_type, self.initial_colors, self.sticker_indices) = position_layout(self.x, self.y, self.z)
+        # A block owned by a cube reads the cube's stickers, so that pending lazy moves are applied first
+        self.cube = cube
+        self._stickers = stickers if stickers is not None or cube is not None else list(SOLVED_STICKERS)
         
+    def __reduce__(self):
+        """ Pickles and copies the coordinates and storage only: the shared layout is looked up again """
+        return (Block, (self.x, self.y, self.z, self._stickers, self.cube))
+
     def __repr__(self):
         return f"({self.x}, {self.y}, {self.z})\t{self.block_type}\t\t{', '.join([f'{f}: {c}' for f, c in self.colors.items()])}\n"
     
+    @property
+    def stickers(self):
+        """ The sticker array this block's colors are stored in """
+        return self.cube.stickers if self.cube is not None else self._stickers
+
+    @property
+    def colors(self):
+        """ Colors dictionary, read from the sticker array """
+        stickers = self.stickers
+        return {face: stickers[index] for face, index in self.sticker_indices.items()}
+
+    @colors.setter
+    def colors(self, face_colors):
+        stickers = self.stickers
+        for face, color in face_colors.items():
+            stickers[self.sticker_indices[face]] = color
+
     def get_x_y_z(self):
         """ returns tuple of coordinates (x, y, z)"""
         return (self.x, self.y, self.z)
@@ -43,26 +78,26 @@ class Block:
     def get_color(self, face):
         """ Gets the color facing *face* """
         try:
-            color = self.colors[face]
+            color = self.stickers[self.sticker_indices[face]]
         except KeyError:
             color = None
         return color
     
     def get_faces(self):
         """ Given a block, returns tuple of faces that the block is facing"""
-        return tuple(self.colors.keys())
+        return tuple(self.sticker_indices.keys())
     
     def set_color(self, face, color):
         """ Sets the square facing *face* to *color*, returning True on success and False otherwise """
-        if (face in self.colors.keys()):
-            self.colors[face] = color
+        if (face in self.sticker_indices):
+            self.stickers[self.sticker_indices[face]] = color
             return True
         else:
             return False  
         
     def set_colors(self, face_colors):
         """ Sets the colors dictionary to face_colors """
-        self.colors = face_colors.copy()
+        self.colors = face_colors
     
     def is_solved(self):
         """ Does this cube have all of its initial colors facing the correct faces? """
@@ -0,0 +1,132 @@
+""" Caching of query results keyed by cube state: a bounded in-memory LRU with optional expiry,
+backed by an optional on-disk dbm file """
+
+import dbm
+import json
+import time
+from collections import OrderedDict
+from functools import wraps
+from enums import *
+
+DEFAULT_MAX_ENTRIES = 4096
+MISSING = object() # Returned by get for keys that are not cached
+COLOR_CODES = {color: color.value + 3 for color in Color}
+
+def state_key(stickers):
+    """ Key for a sticker array: one byte per sticker. Several times faster to build than RubiksCube.to_bytes,
+    and valid for hand-edited cubes too """
+    return bytes(map(COLOR_CODES.__getitem__, stickers))
+
+class DiskTier:
+    """ dbm file holding JSON-encoded values with their expiry time """
+    def __init__(self, path):
+        self.db = dbm.open(path, "c")
+
+    def get(self, key, now):
+        data = self.db.get(key)
+        if data is None:
+            return MISSING
+        (expires, value) = json.loads(data)
+        if expires is not None and expires <= now:
+            del self.db[key]
+            return MISSING
+        return value
+
+    def put(self, key, value, expires):
+        self.db[key] = json.dumps([expires, value])
+
+    def clear(self):
+        for key in list(self.db.keys()):
+            del self.db[key]
+
+    def close(self):
+        self.db.close()
+
+class StateCache:
+    """ LRU cache of at most max_entries results. With ttl (seconds), entries expire. With path, results are also
+    written to a dbm file, consulted on memory misses, so they outlive the process (values must then be JSON-serializable) """
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=None, path=None, clock=time.time):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict() # key -> (expiry time or None, value), least recently used first
+        self.disk = DiskTier(path) if path else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """ Returns the cached value for key, or MISSING """
+        entry = self.entries.get(key)
+        now = self.clock()
+        if entry is not None:
+            (expires, value) = entry
+            if expires is None or expires > now:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self.entries[key]
+        if self.disk is not None:
+            value = self.disk.get(key, now)
+            if value is not MISSING:
+                self.disk_hits += 1
+                self.remember(key, value, now)
+                return value
+        self.misses += 1
+        return MISSING
+
+    def put(self, key, value):
+        now = self.clock()
+        self.remember(key, value, now)
+        if self.disk is not None:
+            self.disk.put(key, value, self.entries[key][0])
+
+    def remember(self, key, value, now):
+        """ Stores value in memory, evicting the least recently used entry when full """
+        self.entries[key] = (now + self.ttl if self.ttl is not None else None, value)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """ Returns the cached value for key, calling compute() and caching its result on a miss """
+        value = self.get(key)
+        if value is MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """ Drops every entry, on disk too. The counters are kept """
+        self.entries.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+            self.disk = None
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {"entries": len(self.entries), "hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0}
+
+def cached_query(namespace):
+    """ Decorator for RubiksCube query methods: results are cached in the cube's query_cache (if it has one) under
+    namespace, the arguments and the cube's state. The method must depend on nothing else """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = self.query_cache
+            if cache is None:
+                return method(self, *args, **kwargs)
+            key = f"{namespace}{args!r}{sorted(kwargs.items())!r}:".encode() + state_key(self.stickers)
+            return cache.get_or_compute(key, lambda: method(self, *args, **kwargs))
+        return wrapper
+    return decorator
@@ -0,0 +1,78 @@
+""" NumPy-backed batch of Rubik's Cube states """
+
+import numpy as np
+from enums import *
+from move_tables import MOVES, STICKER_CENTERS, STICKER_FACES, compose
+from rubiks_cube import RubiksCube
+
+COLORS = tuple(Color(face.value) for face in STICKER_FACES) # Color code i is the solved color of face i in URFDLB order
+COLOR_CODES = {color: code for code, color in enumerate(COLORS)}
+MOVE_NAMES = tuple(MOVES)
+MOVE_CODES = {name: code for code, name in enumerate(MOVE_NAMES)}
+MOVE_TABLE = np.array([MOVES[name] for name in MOVE_NAMES], dtype=np.intp)
+CENTERS = np.array(STICKER_CENTERS, dtype=np.intp)
+SOLVED_ROW = np.repeat(np.arange(len(COLORS), dtype=np.uint8), 9)
+
+class CubeBatch:
+    """ N cube states held as an (N, 54) uint8 array of color codes in URFDLB facelet order """
+    def __init__(self, states):
+        self.states = np.ascontiguousarray(states, dtype=np.uint8)
+        if self.states.ndim != 2 or self.states.shape[1] != len(SOLVED_ROW):
+            raise ValueError(f"States must have shape (N, {len(SOLVED_ROW)}), got {self.states.shape}")
+
+    def __len__(self):
+        return len(self.states)
+
+    def __repr__(self):
+        return f"CubeBatch({len(self)} cubes, {int(self.is_solved().sum())} solved)"
+
+    @classmethod
+    def solved(cls, n):
+        """ Returns a batch of n solved cubes """
+        return cls(np.tile(SOLVED_ROW, (n, 1)))
+
+    @classmethod
+    def from_cubes(cls, cubes):
+        """ Builds a batch from an iterable of RubiksCube instances """
+        rows = [[COLOR_CODES[color] for color in cube.stickers] for cube in cubes]
+        return cls(np.array(rows, dtype=np.uint8).reshape(-1, len(SOLVED_ROW)))
+
+    def to_cube(self, index):
+        """ Returns row index as a new RubiksCube """
+        cube = RubiksCube()
+        cube.stickers[:] = [COLORS[code] for code in self.states[index]]
+        return cube
+
+    def to_cubes(self):
+        """ Returns every row as a list of new RubiksCube instances """
+        return [self.to_cube(index) for index in range(len(self))]
+
+    def apply(self, move_name):
+        """ Applies one move (any name in move_tables.MOVES) to every cube """
+        self.states = self.states[:, MOVES[move_name]]
+
+    def apply_moves(self, move_names):
+        """ Applies a sequence of moves to every cube as one composed gather """
+        self.states = self.states[:, compose(*(MOVES[name] for name in move_names))]
+
+    def apply_per_row(self, move_names):
+        """ Applies move_names[i] to cube i. Accepts move names or an array of MOVE_CODES """
+        if isinstance(move_names, np.ndarray):
+            codes = move_names
+        else:
+            codes = np.array([MOVE_CODES[name] for name in move_names], dtype=np.intp)
+        if codes.shape != (len(self),):
+            raise ValueError(f"Expected one move per cube ({len(self)}), got {codes.shape}")
+        # One gather per distinct move keeps the temporary index arrays small for large batches
+        for code in np.unique(codes):
+            rows = np.flatnonzero(codes == code)
+            self.states[rows] = self.states[rows[:, None], MOVE_TABLE[code]]
+
+    def is_solved(self):
+        """ Boolean array: is each cube solved? (every face a single color, in any orientation) """
+        return (self.states == self.states[:, CENTERS]).all(axis=1)
+
+    def face_color_counts(self):
+        """ Returns an (N, 6, 6) array: counts[n, face, color] is how many stickers of color on face of cube n """
+        faces = self.states.reshape(len(self), len(STICKER_FACES), 9)
+        return np.stack([(faces == code).sum(axis=2, dtype=np.uint8) for code in range(len(COLORS))], axis=2)
@@ -0,0 +1,247 @@
+""" Cubie-level representation of a Rubik's Cube: corner/edge permutation and orientation, and their coordinates """
+
+from math import comb, factorial
+from move_tables import MOVES, ROTATIONS, SOLVED_STICKERS, STICKER_FACES
+
+# Corners: URF, UFL, ULB, UBR, DFR, DLF, DBL, DRB. Edges: UR, UF, UL, UB, DR, DF, DL, DB, FR, FL, BL, BR
+# Each piece lists its sticker indices (URFDLB facelet order), starting with the U/D sticker when it has one
+CORNER_STICKERS = ((8, 9, 20), (6, 18, 38), (0, 36, 47), (2, 45, 11), (29, 26, 15), (27, 44, 24), (33, 53, 42), (35, 17, 51))
+EDGE_STICKERS = ((5, 10), (7, 19), (3, 37), (1, 46), (32, 16), (28, 25), (30, 43), (34, 52), (23, 12), (21, 41), (50, 39), (48, 14))
+CORNER_FACES = tuple(tuple(index // 9 for index in stickers) for stickers in CORNER_STICKERS)
+EDGE_FACES = tuple(tuple(index // 9 for index in stickers) for stickers in EDGE_STICKERS)
+SLICE_EDGES = range(8, 12) # FR, FL, BL, BR: the edges between the U and D layers
+# Sticker labels of a piece -> (piece, orientation)
+CORNER_LOOKUP = {tuple(faces[(i - twist) % 3] for i in range(3)): (piece, twist) for piece, faces in enumerate(CORNER_FACES) for twist in range(3)}
+EDGE_LOOKUP = {tuple(faces[(i + flip) % 2] for i in range(2)): (piece, flip) for piece, faces in enumerate(EDGE_FACES) for flip in range(2)}
+# Center colors (URFDLB) of each of the 24 cube orientations
+ORIENTATIONS = [tuple(SOLVED_STICKERS[perm[9 * face + 4]] for face in range(len(STICKER_FACES))) for perm in ROTATIONS]
+ORIENTATION_INDEX = {centers: index for index, centers in enumerate(ORIENTATIONS)}
+
+# Coordinate sizes
+N_TWIST = 3 ** 7
+N_FLIP = 2 ** 11
+N_SLICE = comb(12, 4)
+N_CORNERS = 40320 # 8!
+N_UD_EDGES = 40320 # 8! permutations of the U and D layer edges, in phase 2
+N_SLICE_SORTED = 24 # 4! permutations of the slice edges, in phase 2
+N_MOVES = 18 # Face turns in URFDLB order, each as CW, 2, CCW
+
+def face_labels(stickers):
+    """ Maps each sticker's color to the index (URFDLB) of the face whose center has that color """
+    centers = {stickers[9 * face + 4]: face for face in range(len(STICKER_FACES))}
+    if len(centers) != len(STICKER_FACES):
+        raise ValueError("Face centers must all have different colors")
+    try:
+        return [centers[color] for color in stickers]
+    except KeyError as error:
+        raise ValueError(f"Color {error.args[0].name} does not match any face center") from None
+
+def permutation_index(perm):
+    """ Returns the rank (0 to n! - 1) of a permutation of range(n) """
+    index = 0
+    for i, value in enumerate(perm):
+        index = index * (len(perm) - i) + sum(1 for later in perm[i + 1:] if later < value)
+    return index
+
+def index_permutation(index, items):
+    """ Inverse of permutation_index: the permutation of sorted items with the given rank """
+    digits = []
+    for radix in range(1, len(items) + 1):
+        index, digit = divmod(index, radix)
+        digits.append(digit)
+    remaining = list(items)
+    return [remaining.pop(digit) for digit in reversed(digits)]
+
+def permutation_parity(perm):
+    """ 0 for even permutations, 1 for odd """
+    return sum(1 for i in range(len(perm)) for j in range(i + 1, len(perm)) if perm[i] > perm[j]) % 2
+
+class CubieCube:
+    """ Cube state as corner permutation (cp) and orientation (co), edge permutation (ep) and orientation (eo).
+    cp[i] is the corner that sits at position i ("replaced by" convention), and likewise for edges """
+    def __init__(self, cp=None, co=None, ep=None, eo=None):
+        self.cp = list(cp) if cp is not None else list(range(8))
+        self.co = list(co) if co is not None else [0] * 8
+        self.ep = list(ep) if ep is not None else list(range(12))
+        self.eo = list(eo) if eo is not None else [0] * 12
+
+    def __repr__(self):
+        return f"CubieCube(cp={self.cp}, co={self.co}, ep={self.ep}, eo={self.eo})"
+
+    def __eq__(self, other):
+        return isinstance(other, CubieCube) and (self.cp, self.co, self.ep, self.eo) == (other.cp, other.co, other.ep, other.eo)
+
+    def copy(self):
+        return CubieCube(self.cp, self.co, self.ep, self.eo)
+
+    @classmethod
+    def from_labels(cls, labels):
+        """ Builds a CubieCube from 54 face labels (see face_labels). Raises ValueError if a piece does not exist """
+        cube = cls()
+        for position, stickers in enumerate(CORNER_STICKERS):
+            try:
+                (cube.cp[position], cube.co[position]) = CORNER_LOOKUP[tuple(labels[index] for index in stickers)]
+            except KeyError:
+                raise ValueError(f"Corner at {position} has colors that do not form a corner piece") from None
+        for position, stickers in enumerate(EDGE_STICKERS):
+            try:
+                (cube.ep[position], cube.eo[position]) = EDGE_LOOKUP[tuple(labels[index] for index in stickers)]
+            except KeyError:
+                raise ValueError(f"Edge at {position} has colors that do not form an edge piece") from None
+        return cube
+
+    @classmethod
+    def from_stickers(cls, stickers):
+        """ Builds a CubieCube from a sticker array such as RubiksCube.stickers """
+        return cls.from_labels(face_labels(stickers))
+
+    def to_labels(self):
+        """ Returns the 54 face labels of this state, with centers in their home positions """
+        labels = [index // 9 for index in range(54)]
+        for position, stickers in enumerate(CORNER_STICKERS):
+            for i, index in enumerate(stickers):
+                labels[index] = CORNER_FACES[self.cp[position]][(i - self.co[position]) % 3]
+        for position, stickers in enumerate(EDGE_STICKERS):
+            for i, index in enumerate(stickers):
+                labels[index] = EDGE_FACES[self.ep[position]][(i + self.eo[position]) % 2]
+        return labels
+
+    def verify(self):
+        """ Raises ValueError if this state can not be reached from a solved cube """
+        if sorted(self.cp) != list(range(8)) or sorted(self.ep) != list(range(12)):
+            raise ValueError("Some pieces are duplicated or missing")
+        if sum(self.co) % 3:
+            raise ValueError("Corner twists do not sum to a multiple of 3")
+        if sum(self.eo) % 2:
+            raise ValueError("A single edge is flipped")
+        if permutation_parity(self.cp) != permutation_parity(self.ep):
+            raise ValueError("Corner and edge permutation parities differ")
+
+    def multiply_corners(self, other):
+        """ Applies other's corner permutation and twist after this state """
+        self.co = [(self.co[j] + twist) % 3 for j, twist in zip(other.cp, other.co)]
+        self.cp = [self.cp[j] for j in other.cp]
+
+    def multiply_edges(self, other):
+        """ Applies other's edge permutation and flip after this state """
+        self.eo = [(self.eo[j] + flip) % 2 for j, flip in zip(other.ep, other.eo)]
+        self.ep = [self.ep[j] for j in other.ep]
+
+    def multiply(self, other):
+        """ Applies other (for example a move) after this state """
+        self.multiply_corners(other)
+        self.multiply_edges(other)
+
+    # Phase 1 coordinates
+
+    def get_twist(self):
+        twist = 0
+        for orientation in self.co[:7]:
+            twist = 3 * twist + orientation
+        return twist
+
+    def set_twist(self, twist):
+        for i in range(6, -1, -1):
+            twist, self.co[i] = divmod(twist, 3)
+        self.co[7] = -sum(self.co[:7]) % 3
+
+    def get_flip(self):
+        flip = 0
+        for orientation in self.eo[:11]:
+            flip = 2 * flip + orientation
+        return flip
+
+    def set_flip(self, flip):
+        for i in range(10, -1, -1):
+            flip, self.eo[i] = divmod(flip, 2)
+        self.eo[11] = sum(self.eo[:11]) % 2
+
+    def get_slice(self):
+        """ Which 4 of the 12 edge positions hold slice edges, ignoring their order. 0 when they are all in the slice """
+        index, found = 0, 0
+        for position in range(11, -1, -1):
+            if self.ep[position] in SLICE_EDGES:
+                index += comb(11 - position, found + 1)
+                found += 1
+        return index
+
+    def set_slice(self, index):
+        """ Places the slice edges in the positions given by index, and the other edges in order around them """
+        positions = set()
+        k = 11
+        for count in range(4, 0, -1):
+            while comb(k, count) > index:
+                k -= 1
+            index -= comb(k, count)
+            positions.add(11 - k)
+            k -= 1
+        slice_edges = iter(SLICE_EDGES)
+        other_edges = iter(range(8))
+        self.ep = [next(slice_edges) if position in positions else next(other_edges) for position in range(12)]
+
+    # Phase 2 coordinates, only meaningful once the slice edges are in the slice
+
+    def get_corners(self):
+        return permutation_index(self.cp)
+
+    def set_corners(self, index):
+        self.cp = index_permutation(index, range(8))
+
+    def get_ud_edges(self):
+        return permutation_index(self.ep[:8])
+
+    def set_ud_edges(self, index):
+        self.ep[:8] = index_permutation(index, range(8))
+
+    def get_slice_sorted(self):
+        return permutation_index([edge - 8 for edge in self.ep[8:]])
+
+    def set_slice_sorted(self, index):
+        self.ep[8:] = index_permutation(index, SLICE_EDGES)
+
+# Compact state encoding: cube orientation, then corner and edge permutation and orientation, in 10 bytes
+STATE_BYTES = 10
+
+def encode_stickers(stickers):
+    """ Packs a sticker array into STATE_BYTES bytes. Raises ValueError if it is not made of real, distinct pieces """
+    orientation = ORIENTATION_INDEX.get(tuple(stickers[9 * face + 4] for face in range(len(STICKER_FACES))))
+    if orientation is None:
+        raise ValueError("Face centers are not in a possible arrangement")
+    cube = CubieCube.from_stickers(stickers)
+    if len(set(cube.cp)) != len(cube.cp) or len(set(cube.ep)) != len(cube.ep):
+        raise ValueError("Some pieces are duplicated")
+    value = orientation * factorial(8) + permutation_index(cube.cp)
+    for twist in cube.co:
+        value = 3 * value + twist
+    value = value * factorial(12) + permutation_index(cube.ep)
+    for flip in cube.eo:
+        value = 2 * value + flip
+    return value.to_bytes(STATE_BYTES, "big")
+
+def decode_stickers(data):
+    """ Inverse of encode_stickers: returns the list of 54 sticker colors """
+    if len(data) != STATE_BYTES:
+        raise ValueError(f"Encoded states are {STATE_BYTES} bytes long, got {len(data)}")
+    value = int.from_bytes(data, "big")
+    cube = CubieCube()
+    for i in range(11, -1, -1):
+        value, cube.eo[i] = divmod(value, 2)
+    value, ep = divmod(value, factorial(12))
+    for i in range(7, -1, -1):
+        value, cube.co[i] = divmod(value, 3)
+    (orientation, cp) = divmod(value, factorial(8))
+    if orientation >= len(ORIENTATIONS):
+        raise ValueError("Not a valid encoded state")
+    cube.cp = index_permutation(cp, range(8))
+    cube.ep = index_permutation(ep, range(12))
+    centers = ORIENTATIONS[orientation]
+    return [centers[label] for label in cube.to_labels()]
+
+def move_cubes():
+    """ The 18 face turns (URFDLB, each as CW, 2, CCW) as CubieCubes, derived from the sticker move tables """
+    solved = [index // 9 for index in range(54)]
+    return [CubieCube.from_labels([solved[source] for source in MOVES[face.name + notation]])
+            for face in STICKER_FACES for notation in ("", "2", "'")]
+
+MOVE_NAMES = tuple(face.name + notation for face in STICKER_FACES for notation in ("", "2", "'"))
+MOVE_CUBES = move_cubes()
@@ -0,0 +1,80 @@
+""" Facelet strings: a cube state as one letter per sticker, in URFDLB facelet order. Each letter names the face
+whose solved color the sticker has, so a cube in the standard orientation gives the usual 54-character string
+(UUUUUUUUURRRRRRRRRFFFFFFFFFDDDDDDDDDLLLLLLLLLBBBBBBBBB when solved). Also reads and writes large files of them """
+
+import argparse
+import sys
+import cubie
+from enums import *
+
+WRITE_BATCH = 4096 # Lines joined per write call
+LETTER_COLORS = {face.name: Color(face.value) for face in Face}
+COLOR_LETTERS = {color: letter for letter, color in LETTER_COLORS.items()}
+CONVERSIONS = ("to-bytes", "from-bytes", "check")
+
+def to_facelets(stickers):
+    """ Returns the facelet string of a sticker array (a RubiksCube's, or an NxNCube's for 6 * N * N letters) """
+    return "".join(map(COLOR_LETTERS.__getitem__, stickers))
+
+def from_facelets(text, length=54):
+    """ Returns the sticker array of a facelet string of length letters. Raises ValueError """
+    if len(text) != length:
+        raise ValueError(f"A facelet string has {length} letters, got {len(text)}")
+    try:
+        return list(map(LETTER_COLORS.__getitem__, text))
+    except KeyError as error:
+        raise ValueError(f"'{error.args[0]}' is not a face letter (URFDLB)") from None
+
+def read_facelets(file, cubes=False):
+    """ Lazily yields the sticker array of each non-empty line of file. With cubes, yields RubiksCube objects instead
+    (their Blocks are only built if used). Raises ValueError, naming the line, for malformed lines """
+    if cubes:
+        from rubiks_cube import RubiksCube
+    for number, line in enumerate(file, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            stickers = from_facelets(line)
+        except ValueError as error:
+            raise ValueError(f"Line {number}: {error}") from None
+        yield RubiksCube.from_stickers(stickers) if cubes else stickers
+
+def write_facelets(file, states):
+    """ Writes the facelet string of each sticker array (or cube) in states to file, one per line """
+    strings = (to_facelets(getattr(state, "stickers", state)) for state in states)
+    while batch := [string for _, string in zip(range(WRITE_BATCH), strings)]:
+        file.write("\n".join(batch) + "\n")
+
+def convert(conversion, input_file, output_file):
+    """ Streams input_file to output_file: facelet strings to RubiksCube.to_bytes hex states (to-bytes), back (from-bytes),
+    or facelet strings to the first violation that makes them impossible, 'ok' otherwise (check) """
+    match conversion:
+        case "to-bytes":
+            lines = (cubie.encode_stickers(stickers).hex() for stickers in read_facelets(input_file))
+        case "from-bytes":
+            lines = (to_facelets(cubie.decode_stickers(bytes.fromhex(line))) for line in map(str.strip, input_file) if line)
+        case "check":
+            import validation
+            lines = (validation.check_stickers(stickers) or "ok" for stickers in read_facelets(input_file))
+        case _:
+            raise ValueError(f"Unknown conversion '{conversion}', expected one of {', '.join(CONVERSIONS)}")
+    while batch := [line for _, line in zip(range(WRITE_BATCH), lines)]:
+        output_file.write("\n".join(batch) + "\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert files of facelet strings, one state per line")
+    parser.add_argument("conversion", choices=CONVERSIONS, help="to-bytes: facelets to hex states (as used by --batch), "
+                                                                "from-bytes: back to facelets, check: report impossible states")
+    parser.add_argument("input", help="input file, or - for stdin")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    args = parser.parse_args()
+    try:
+        with sys.stdin if args.input == "-" else open(args.input) as input_file, \
+             open(args.output, "w") if args.output else sys.stdout as output_file:
+            convert(args.conversion, input_file, output_file)
+    except ValueError as error:
+        sys.exit(f"Error: {error}")
+
+if __name__ == "__main__":
+    main()
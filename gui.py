@@ -1,12 +1,47 @@
 """ The GUI class """
 
 import tkinter as tk
+from collections import deque
 from tkinter import *
 from gui_constants import *
+from history import History
+from move_tables import STICKER_INDEX
+from nxn_cube import sticker_layout
+
+def visible_stickers(size):
+    """ Returns (sticker index, polygon points) for every sticker drawn on a size x size cube """
+    if size == 3:
+        return [(STICKER_INDEX[(coordinates, face)], list(sum(square, ()))) # Flatten array of tuples
+                for (face, face_dict) in VISIBLE_FACES for coordinates, square in face_dict.items()]
+    visible = [face for (face, _) in VISIBLE_FACES]
+    return [(index, list(sum(sticker_polygon(coordinates, face, size), ())))
+            for index, (coordinates, face) in enumerate(sticker_layout(size)) if face in visible]
+
+class StickerView():
+    """ Retained-mode drawing of the visible stickers: polygons are created once, then only recolored when they change """
+    def __init__(self, canvas, cube):
+        self.canvas = canvas
+        self.cube = cube
+        self.items = [] # (sticker index, canvas item id)
+        self.drawn_colors = {} # canvas item id -> color it currently shows
+        for (index, points) in visible_stickers(cube.size):
+            color = cube.stickers[index]
+            item = canvas.create_polygon(points, outline='#111', fill=color.name, width=max(1, 9 // cube.size))
+            self.items.append((index, item))
+            self.drawn_colors[item] = color
+
+    def draw(self):
+        """ Recolors the stickers whose color changed since the last draw """
+        stickers = self.cube.stickers
+        for (index, item) in self.items:
+            color = stickers[index]
+            if self.drawn_colors[item] is not color:
+                self.canvas.itemconfig(item, fill=color.name)
+                self.drawn_colors[item] = color
 
 class Gui():
     """ Class for drawing a Rubik's Cube using tkinter """
-    def __init__(self, root, cube):
+    def __init__(self, root, cube, history=None):
         self.root=root
         self.root.title("Rubik's Cube")
 
@@ -14,7 +49,10 @@ class Gui():
         self.canvas.grid(row=0,column=0)
         
         self.cube = cube
-        self.cube.draw(self.canvas)
+        self.sticker_view = StickerView(self.canvas, cube)
+        self.history = history or History(cube)
+        self.move_queue = deque() # (cube method, arguments) waiting for the next frame
+        self.frame_scheduled = False
         
         self.root.bind('<f>', self.f_keybind)
         self.root.bind('<r>', self.r_keybind)
@@ -40,6 +78,8 @@ class Gui():
         self.root.bind('<X>', self.x_keybind)
         self.root.bind('<Y>', self.y_keybind)
         self.root.bind('<Z>', self.z_keybind)
+        self.root.bind('<Control-z>', self.undo_keybind)
+        self.root.bind('<Control-y>', self.redo_keybind)
         
         self.solved_label = tk.Label(self.root, text="Solved")
         self.solved_label.grid(row=1, column=0, pady=20)  
@@ -69,41 +109,65 @@ class Gui():
 
     
     def update_solved(self):
-        if self.cube.is_solved():
-            self.solved_label.config(text="Solved")
-        else:
-            self.solved_label.config(text="Not Solved")
-        self.solved_label.update_idletasks()
+        text = "Solved" if self.cube.is_solved() else "Not Solved"
+        if self.solved_label.cget("text") != text:
+            self.solved_label.config(text=text)
+
+    def enqueue(self, method, *args):
+        """ Queues a cube method call for the next frame, so bursts of input are applied and drawn together """
+        self.move_queue.append((method, args))
+        if not self.frame_scheduled:
+            self.frame_scheduled = True
+            self.root.after(FRAME_MS, self.process_frame)
+
+    def process_frame(self):
+        """ Applies up to MOVES_PER_FRAME queued moves, then draws and refreshes the solved label once """
+        queue = self.move_queue
+        for _ in range(min(len(queue), MOVES_PER_FRAME)):
+            (method, args) = queue.popleft()
+            method(*args)
+        self.sticker_view.draw()
+        self.update_solved()
+        self.frame_scheduled = bool(queue)
+        if queue:
+            self.root.after(FRAME_MS, self.process_frame)
+    
+    def perform(self, method, *args):
+        """ Calls a cube move method and logs the moves it returns in the history """
+        try:
+            self.history.record_moves(method(*args).split())
+        except ValueError: # A move this cube size does not have, such as M on a 4x4
+            pass
+
+    def restart(self):
+        self.cube.reset()
+        self.history.restart()
     
     def rotate(self, face, rotation):
-        self.cube.rotate(face, rotation)
-        self.cube.draw(self.canvas)
-        self.update_solved()
+        self.enqueue(self.perform, self.cube.rotate, face, rotation)
         
     def rotate_axis(self, axis, rotation):
-        self.cube.rotate_axis(axis, rotation)
-        self.cube.draw(self.canvas)
-        self.update_solved()
+        self.enqueue(self.perform, self.cube.rotate_axis, axis, rotation)
         
     def view(self, orientation, rotation):
-        self.cube.view(orientation, rotation)
-        self.cube.draw(self.canvas)
-        self.update_solved()
+        self.enqueue(self.perform, self.cube.view, orientation, rotation)
         
     def double_turn(self, double, rotation):
-        self.cube.double_turn(double, rotation)
-        self.cube.draw(self.canvas)
-        self.update_solved()
+        self.enqueue(self.perform, self.cube.double_turn, double, rotation)
 
     def scramble(self):
-        self.cube.randomize(50)
-        self.cube.draw(self.canvas)
-        self.update_solved()
+        self.enqueue(self.perform, self.cube.randomize, 50)
     
     def reset(self):
-        self.cube.reset()
-        self.cube.draw(self.canvas)
-        self.update_solved()
+        # Moves still queued would be undone by the reset anyway
+        self.move_queue.clear()
+        self.enqueue(self.restart)
+
+    def undo_keybind(self, event):
+        self.enqueue(self.history.undo)
+
+    def redo_keybind(self, event):
+        self.enqueue(self.history.redo)
         
     def f_keybind(self, event):
         self.rotate(Face.F, Rotation.CW)
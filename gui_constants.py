@@ -38,6 +38,40 @@ SIDE_FACE = {
     (1, -1, 1): [(375, 249), (375, 321), (423, 297), (423, 226)]  #RBD
 }
 
+FRAME_MS = 16 # Queued moves are applied and drawn at most once per frame
+MOVES_PER_FRAME = 64 # Moves applied per frame, so a long burst cannot stall the UI
+
+VISIBLE_FACES = [
+    (Face.U, TOP_FACE),
+    (Face.F, FRONTAL_FACE),
+    (Face.R, SIDE_FACE)
+]
+
+# The drawing above as a projection: the top-left-front corner of the cube, and one 3x3 sticker step
+# to the right, to the back and down. Cubes of other sizes are drawn in the same space
+CUBE_ORIGIN = (96, 98)
+CUBE_RIGHT = (61, 17.3)
+CUBE_BACK = (48, -23.3)
+CUBE_DOWN = (0, 71.3)
+
+def project(right, back, down, size):
+    """ Canvas point of a position on a size x size cube, measured in stickers from the top-left-front corner """
+    scale = 3 / size
+    return tuple(origin + scale * (right * r + back * b + down * d) for origin, r, b, d in zip(CUBE_ORIGIN, CUBE_RIGHT, CUBE_BACK, CUBE_DOWN))
+
+def sticker_polygon(coordinates, face, size):
+    """ Corners of a visible (U, F or R) sticker of a size x size cube, coordinates as in nxn_cube.face_coordinates """
+    (x, y, z) = ((value + size - 1) // 2 for value in coordinates) # Sticker steps from the left, bottom and front
+    down = size - 1 - y
+    match face:
+        case Face.U:
+            corners = [(x, z + 1, 0), (x + 1, z + 1, 0), (x + 1, z, 0), (x, z, 0)]
+        case Face.F:
+            corners = [(x, 0, down), (x + 1, 0, down), (x + 1, 0, down + 1), (x, 0, down + 1)]
+        case Face.R:
+            corners = [(size, z, down), (size, z + 1, down), (size, z + 1, down + 1), (size, z, down + 1)]
+    return [project(*corner, size) for corner in corners]
+
 FACE_BUTTONS = [
     ("F", Face.F),
     ("R", Face.R),
@@ -0,0 +1,120 @@
+""" Undo/redo history of the moves applied to a cube """
+
+from array import array
+from enums import *
+from move_tables import MOVES
+
+CHECKPOINT_INTERVAL = 256 # Entries between state snapshots
+ALGORITHM = 0xFFFF # Code of an entry that is a whole algorithm, kept in History.algorithms
+MOVE_NAMES = list(MOVES) # Move code -> name. Starts with the 3x3 moves; other moves (such as 3Rw) are added when first seen
+MOVE_CODES = {name: code for code, name in enumerate(MOVE_NAMES)}
+COLORS = list(Color)
+COLOR_CODES = {color: code for code, color in enumerate(COLORS)}
+
+def move_code(move_name):
+    if move_name not in MOVE_CODES:
+        MOVE_CODES[move_name] = len(MOVE_NAMES)
+        MOVE_NAMES.append(move_name)
+    return MOVE_CODES[move_name]
+
+def inverse_move(move_name):
+    return move_name[:-1] if move_name.endswith("'") else move_name if move_name.endswith("2") else move_name + "'"
+
+class History:
+    """ Session history of a cube (a RubiksCube or an NxNCube). Every move is logged as a two-byte code, and every
+    algorithm as one entry holding the compiled algorithm. A one-byte-per-sticker snapshot is kept every
+    CHECKPOINT_INTERVAL entries, so any point is reached with at most that many replayed entries """
+    def __init__(self, cube, checkpoint_interval=CHECKPOINT_INTERVAL):
+        self.cube = cube
+        self.checkpoint_interval = checkpoint_interval
+        self.restart()
+
+    def __len__(self):
+        """ Number of entries in the history, including undone entries that can be redone """
+        return len(self.codes)
+
+    def restart(self):
+        """ Forgets every move and makes the cube's current state the start of the history (after a reset or a manual color change) """
+        self.codes = array("H")
+        self.algorithms = {} # Position of each ALGORITHM entry -> (text, compiled algorithm)
+        self.position = 0 # Entries applied from the start of the history
+        self.checkpoints = [self.snapshot()] # checkpoints[i] is the state after i * checkpoint_interval moves
+
+    def snapshot(self):
+        return bytes(COLOR_CODES[color] for color in self.cube.stickers)
+
+    def restore(self, snapshot):
+        self.cube.stickers[:] = [COLORS[code] for code in snapshot]
+        self.cube.recount_solved()
+
+    def record(self, move_name):
+        """ Logs a move that was just applied to the cube. Entries that were undone can no longer be redone """
+        self.append(move_code(move_name))
+
+    def record_algorithm(self, algorithm, text):
+        """ Logs an algorithm that was just applied to the cube (an Algorithm or NxNAlgorithm, as returned by
+        apply_algorithm) as a single entry named text, so its size does not matter to the history """
+        self.append(ALGORITHM, (text, algorithm))
+
+    def append(self, code, algorithm=None):
+        if self.position < len(self.codes):
+            del self.codes[self.position:]
+            del self.checkpoints[self.position // self.checkpoint_interval + 1:]
+            for position in [position for position in self.algorithms if position >= self.position]:
+                del self.algorithms[position]
+        if algorithm is not None:
+            self.algorithms[self.position] = algorithm
+        self.codes.append(code)
+        self.position += 1
+        if self.position % self.checkpoint_interval == 0:
+            self.checkpoints.append(self.snapshot())
+
+    def record_moves(self, move_names):
+        for move_name in move_names:
+            self.record(move_name)
+
+    def entry_name(self, position):
+        """ The move name, or algorithm text, of the entry at position """
+        code = self.codes[position]
+        return self.algorithms[position][0] if code == ALGORITHM else MOVE_NAMES[code]
+
+    def apply_entry(self, position, inverted=False):
+        """ Applies the entry at position to the cube, or its inverse """
+        code = self.codes[position]
+        if code == ALGORITHM:
+            algorithm = self.algorithms[position][1]
+            (algorithm.inverse() if inverted else algorithm).apply(self.cube)
+        else:
+            self.cube.apply_move(inverse_move(MOVE_NAMES[code]) if inverted else MOVE_NAMES[code])
+
+    def undo(self):
+        """ Undoes the last entry. Returns its name, or None if there is nothing to undo """
+        if self.position == 0:
+            return None
+        self.position -= 1
+        self.apply_entry(self.position, inverted=True)
+        return self.entry_name(self.position)
+
+    def redo(self):
+        """ Reapplies the last undone entry. Returns its name, or None if there is nothing to redo """
+        if self.position == len(self.codes):
+            return None
+        self.apply_entry(self.position)
+        self.position += 1
+        return self.entry_name(self.position - 1)
+
+    def jump(self, position):
+        """ Brings the cube to its state after position entries of the history, replaying from whichever is
+        closest: the current state or the checkpoint at or before position """
+        if not 0 <= position <= len(self.codes):
+            raise ValueError(f"Move number must be between 0 and {len(self.codes)}")
+        distance = abs(position - self.position)
+        if position % self.checkpoint_interval < distance:
+            self.restore(self.checkpoints[position // self.checkpoint_interval])
+            self.position = position - position % self.checkpoint_interval
+        while self.position < position:
+            self.apply_entry(self.position)
+            self.position += 1
+        while self.position > position:
+            self.position -= 1
+            self.apply_entry(self.position, inverted=True)
@@ -0,0 +1,118 @@
+""" Opt-in call counters and latency histograms for the cube's hot paths.
+Enable with the RUBIKS_STATS=1 environment variable or instrumentation.enable(). While disabled nothing is wrapped,
+so the cost is zero """
+
+import atexit
+import importlib
+import os
+import sys
+import time
+from functools import wraps
+
+STATS_ENV = "RUBIKS_STATS"
+# (module, class name or None for module functions, attribute names)
+TARGETS = [
+    ("rubiks_cube", "RubiksCube", ["rotate", "rotate_axis", "view", "double_turn", "rotate_from_input", "apply_move", "apply_gather",
+                                   "apply_algorithm", "randomize", "is_solved", "reorient", "get_block", "get_block_from_face_colors", "draw"]),
+    ("algorithm", None, ["parse_algorithm"]),
+]
+MOVE_METHODS = ("rotate", "rotate_axis", "view", "double_turn", "rotate_from_input", "apply_move") # Also counted per move
+
+class Histogram:
+    """ Call count, total time and a log2-bucketed latency histogram (bucket b counts calls under 2**b ns) """
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.buckets = [0] * 64
+
+    def record(self, elapsed_ns):
+        self.count += 1
+        self.total_ns += elapsed_ns
+        self.buckets[min(elapsed_ns.bit_length(), 63)] += 1
+
+    def percentile(self, percentile):
+        """ Upper bound (ns) of the bucket holding the given percentile """
+        target = self.count * percentile / 100
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return 2 ** bucket
+        return 0
+
+stats = {}
+_originals = {}
+_exit_hook_registered = False
+
+def histogram(name):
+    if name not in stats:
+        stats[name] = Histogram()
+    return stats[name]
+
+def instrument(name, function, per_move=False):
+    """ Wraps function so each call is timed into stats[name]. With per_move, calls are also counted per move, e.g. 'RubiksCube.rotate:R'' """
+    overall = histogram(name)
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter_ns()
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter_ns() - start
+        overall.record(elapsed)
+        if per_move:
+            # Move methods return their notation; rotate_from_input and apply_move do not, so use their input instead
+            move = result.strip() if isinstance(result, str) else args[1] if len(args) > 1 else next(iter(kwargs.values()), None)
+            histogram(f"{name}:{move}").record(elapsed)
+        return result
+    return wrapper
+
+def dump_summary():
+    if enabled():
+        print(summary(), file=sys.stderr)
+
+def enabled():
+    return bool(_originals)
+
+def enable(dump_at_exit=True):
+    """ Starts recording. With dump_at_exit, the summary is printed to stderr when the process exits """
+    global _exit_hook_registered
+    if enabled():
+        return
+    modules = [importlib.import_module(module_name) for (module_name, _, _) in TARGETS]
+    if enabled(): # Importing rubiks_cube with RUBIKS_STATS set has just enabled recording
+        return
+    for (module, (module_name, class_name, names)) in zip(modules, TARGETS):
+        owner = getattr(module, class_name) if class_name else module
+        for name in names:
+            original = getattr(owner, name)
+            _originals[(owner, name)] = original
+            setattr(owner, name, instrument(f"{class_name}.{name}" if class_name else name, original, name in MOVE_METHODS))
+    if dump_at_exit and not _exit_hook_registered:
+        atexit.register(dump_summary)
+        _exit_hook_registered = True
+
+def disable():
+    """ Stops recording and restores the original methods. Collected stats are kept """
+    for (owner, name), original in _originals.items():
+        setattr(owner, name, original)
+    _originals.clear()
+
+def reset():
+    """ Clears the collected stats """
+    for entry in stats.values():
+        entry.__init__()
+
+def summary():
+    """ Returns the collected stats as a table, busiest first """
+    if not stats:
+        return "No stats recorded."
+    lines = [f"{'call':<40}{'count':>12}{'total ms':>12}{'mean ns':>12}{'p50 ns':>10}{'p99 ns':>12}"]
+    for name, entry in sorted(stats.items(), key=lambda item: -item[1].total_ns):
+        if entry.count:
+            lines.append(f"{name:<40}{entry.count:>12}{entry.total_ns / 1e6:>12.2f}{entry.total_ns // entry.count:>12}"
+                         f"{entry.percentile(50):>10}{entry.percentile(99):>12}")
+    return "\n".join(lines)
+
+def enable_from_environment():
+    """ Enables instrumentation if RUBIKS_STATS is set to a non-empty value other than 0 """
+    if os.environ.get(STATS_ENV, "0") not in ("", "0"):
+        enable()
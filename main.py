@@ -1,9 +1,14 @@
 """ Main Function """
 
-import tkinter as tk
+import argparse
+import os
+import sys
 
+import batch, facelets, instrumentation, nxn_cube, solver
+from algorithm import compile_algorithm
+from cache import StateCache
 from enums import *
-from gui import Gui
+from history import History
 from rubiks_cube import RubiksCube
 from utilities import *
 
@@ -11,15 +16,51 @@ QUIT_STRINGS = ["quit", "q", "end", "stop", "exit", "quit!"]
 HELP_STRINGS = ["help", "h", "info", "information", "i"]
 SCRAMBLE_STRINGS = ["random", "randomize", "shuffle"]
 DISPLAY_STRINGS = ["print", "p"]
+EXPORT_STRINGS = ["export", "facelets"]
+IMPORT_STRINGS = ["import"]
 GUI_STRINGS = ["gui", "g"]
 MOVE_STRINGS = ["move", "moves"]
 CHANGE_STRINGS = ["change", "c", "manual", "set"]
 REVERSE_STRINGS = ["reverse", "rev"]
 RESET_STRINGS = ["reset"]
 CLEAR_STRINGS = ["clear"]
+STATS_STRINGS = ["stats"]
+SOLVE_STRINGS = ["solve", "solution"]
+UNDO_STRINGS = ["undo"]
+REDO_STRINGS = ["redo"]
+HISTORY_STRINGS = ["history"]
+JUMP_STRINGS = ["jump", "goto"]
+
+SOLVE_TIMEOUT = 1.0 # Seconds spent looking for shorter solutions
+
+parser = argparse.ArgumentParser(description="Rubik's Cube simulator. Starts an interactive session unless --batch is given")
+parser.add_argument("--batch", metavar="FILE", help="read JSON lines of {\"state\", \"moves\"} from FILE (- for stdin), write one JSON result per line and exit")
+parser.add_argument("--size", type=int, default=3, help="cube size for the interactive session (default: %(default)s)")
+args = parser.parse_args()
+
+if args.batch:
+    # Headless: no terminal clearing and no tkinter
+    try:
+        input_file = sys.stdin if args.batch == "-" else open(args.batch)
+    except OSError as error:
+        parser.exit(1, f"Can not read batch file: {error}\n")
+    try:
+        with input_file:
+            batch.run(input_file, sys.stdout)
+        sys.stdout.flush()
+    except BrokenPipeError: # The reader went away (e.g. piped into head)
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    sys.exit()
 
 clear()
-cube = RubiksCube()
+if args.size == 3:
+    cube = RubiksCube()
+    cube.query_cache = StateCache()
+    compile_moves = compile_algorithm
+else:
+    cube = nxn_cube.NxNCube(args.size)
+    compile_moves = lambda text: nxn_cube.compile_algorithm(text, args.size)
+history = History(cube)
 print("New Rubik's Cube created. Type 'g' to view!")
 
 while True:
@@ -38,49 +79,116 @@ while True:
         print("M, M', M2, E, E', E2, S, S', S2 - Perform slice turns")
         print("x, x', x2, y, y', y2, z, z', z2 - Reorient the cube")
         print("f, r, u, l, d, b - Perform double layer turns")
+        print("2R, Rw, 3Rw, 3r, ... - Turn inner layers or blocks of layers (start with --size N for an NxN cube)")
         
         print("random - Scramble the cube. Specify >50 moves to randomize the cube sufficiently.")
         print("print - Display the current cube state in console")
-        print("move - Apply a series of moves to the cube")
+        print("export - Print the state as a facelet string (one letter per sticker, URFDLB order)")
+        print("import - Set the state from a facelet string")
+        print("move - Apply a series of moves to the cube, e.g. R U R' U', (R U)3, [R, U] or [F: [R, U]]")
         print("reverse - Reverse a series of moves")
         print("change - Change the colors of a specific block")
         print("reset - Reset the cube to the initial state")
+        print("solve - Find a solution and apply it to the cube")
+        print("undo, redo - Undo or redo one move (Ctrl+Z and Ctrl+Y in the gui)")
+        print("history - Show the current position in the history (one entry per move or entered algorithm)")
+        print("jump N - Go to the state after entry N of the history")
         print("clear - Clear the console")
+        print("stats - Show call counts and timings (start with RUBIKS_STATS=1, or type 'stats on')")
         print("quit - Close the program")
     elif user_input.lower() in SCRAMBLE_STRINGS:
         try:
             num_rotations = int(input("Number of moves: "))
             log = cube.randomize(num_rotations)
+            history.record_moves(log.split())
             print(f"{num_rotations} random moves have been applied:\n{log}")
         except ValueError:
             print("Invalid number.")
     elif user_input.lower() in DISPLAY_STRINGS:
         print(cube)
+    elif user_input.lower() in EXPORT_STRINGS:
+        print(cube.to_facelets())
+    elif user_input.lower() in IMPORT_STRINGS:
+        try:
+            cube.stickers[:] = facelets.from_facelets(input("Facelet string: ").strip(), len(cube.stickers))
+            cube.recount_solved()
+            history.restart()
+            violation = cube.validate() if args.size == 3 else None
+            if violation:
+                print(f"Warning: a real cube can not be in this state. {violation}.")
+        except ValueError as error:
+            print(f"Invalid facelet string. {error}")
     elif user_input.lower() in GUI_STRINGS:
+        import tkinter as tk
+        from gui import Gui
         root = tk.Tk()
-        gui = Gui(root, cube)
+        gui = Gui(root, cube, history)
         root.mainloop()
     elif user_input.lower() in MOVE_STRINGS:
-        moves = input("Enter one or moves, separated by (space): ").split()
-        for move in moves:
-            move = remove_braces(move)
-            if not cube.rotate_from_input(move):
-                print("Invalid move.")
+        try:
+            text = input("Enter one or moves, separated by (space): ")
+            history.record_algorithm(cube.apply_algorithm(text), text)
+        except ValueError as error:
+            print(f"Invalid move. {error}")
+    elif user_input.lower() in CHANGE_STRINGS + SOLVE_STRINGS and args.size != 3:
+        print("Only available on a 3x3 cube.")
     elif user_input.lower() in CHANGE_STRINGS:
         cube.set_block_colors()
+        history.restart()
+        violation = cube.validate()
+        if violation:
+            print(f"Warning: a real cube can not be in this state. {violation}.")
     elif user_input.lower() in REVERSE_STRINGS:
-        reverse_moves = input("Enter one or moves, separated by (space): ").split()
-        reverse_moves.reverse()
-        for move in reverse_moves:
-            move = remove_braces(move)
-            if not cube.rotate_from_input(move, True):
-                print("Invalid move.")
+        try:
+            text = input("Enter one or moves, separated by (space): ")
+            history.record_algorithm(cube.apply_algorithm(compile_moves(text).inverse()), f"({text})'")
+        except ValueError as error:
+            print(f"Invalid move. {error}")
+    elif user_input.lower() in SOLVE_STRINGS:
+        if not solver.tables_ready():
+            print("Building solver tables for this session. Run 'python tables.py build' to save them for next time...")
+        try:
+            solution = cube.solution(timeout=SOLVE_TIMEOUT)
+            history.record_algorithm(cube.apply_algorithm(solution), solution)
+            print(f"Solved in {len(solution.split())} moves:\n{solution}")
+        except (ValueError, TimeoutError) as error:
+            print(f"Could not solve the cube. {error}")
     elif user_input.lower() in RESET_STRINGS:
         cube.reset()
+        history.restart()
+    elif user_input.lower() in UNDO_STRINGS:
+        move = history.undo()
+        print(f"Undid {move}." if move else "Nothing to undo.")
+    elif user_input.lower() in REDO_STRINGS:
+        move = history.redo()
+        print(f"Redid {move}." if move else "Nothing to redo.")
+    elif user_input.lower() in HISTORY_STRINGS:
+        print(f"At entry {history.position} of {len(history)}.")
+    elif user_input.lower().partition(" ")[0] in JUMP_STRINGS:
+        try:
+            history.jump(int(user_input.partition(" ")[2]))
+            print(f"At entry {history.position} of {len(history)}.")
+        except ValueError as error:
+            print(f"Invalid move number. {error}")
     elif user_input.lower() in CLEAR_STRINGS:
         clear()
-    elif any(user_input.lower().startswith(face.name.lower()) for face in Face) or any(user_input.startswith(axis.name) for axis in Axis) or any(user_input.startswith(orientation.name) for orientation in Orientation):
-        if not cube.rotate_from_input(user_input):
+    elif user_input.lower() in STATS_STRINGS:
+        print(instrumentation.summary() if instrumentation.enabled() else "Stats are off. Type 'stats on' to start recording.")
+        if getattr(cube, "query_cache", None) is not None:
+            print("Solution cache: " + ", ".join(f"{name} {value}" for name, value in cube.query_cache.stats().items()))
+    elif user_input.lower() in ("stats on", "stats off", "stats reset"):
+        match user_input.lower().split()[1]:
+            case "on":
+                instrumentation.enable()
+            case "off":
+                instrumentation.disable()
+            case "reset":
+                instrumentation.reset()
+        print(f"Stats are {'on' if instrumentation.enabled() else 'off'}.")
+    elif user_input[:1].isdigit() or any(user_input.lower().startswith(face.name.lower()) for face in Face) or any(user_input.startswith(axis.name) for axis in Axis) or any(user_input.startswith(orientation.name) for orientation in Orientation):
+        if cube.rotate_from_input(user_input):
+            history.record(user_input)
+        else:
             print("Invalid move.")
     else:
         print("Invalid command. Type 'help' for available commands.")
@@ -0,0 +1,116 @@
+""" Sticker-permutation move tables for the Rubik's Cube """
+
+from operator import itemgetter
+from enums import *
+
+STICKER_FACES = (Face.U, Face.R, Face.F, Face.D, Face.L, Face.B) # Standard facelet (URFDLB) order
+DEPTHS = (0, 1, 2) # Layer depth measured from a face: 0 is the face itself, 2 is the opposite face
+NOTATIONS = {Rotation.CW: "", Rotation.CCW: "'", Rotation.DOUBLE: "2"}
+
+def face_coordinates(face):
+    """ Returns the coordinates of the 9 blocks on face, in facelet reading order """
+    match face:
+        case Face.U:
+            return [(col, 1, row) for row in (1, 0, -1) for col in (-1, 0, 1)]
+        case Face.R:
+            return [(1, row, col) for row in (1, 0, -1) for col in (-1, 0, 1)]
+        case Face.F:
+            return [(col, row, -1) for row in (1, 0, -1) for col in (-1, 0, 1)]
+        case Face.D:
+            return [(col, -1, row) for row in (-1, 0, 1) for col in (-1, 0, 1)]
+        case Face.L:
+            return [(-1, row, col) for row in (1, 0, -1) for col in (1, 0, -1)]
+        case Face.B:
+            return [(col, row, 1) for row in (1, 0, -1) for col in (1, 0, -1)]
+
+STICKERS = [(coordinates, face) for face in STICKER_FACES for coordinates in face_coordinates(face)]
+STICKER_INDEX = {sticker: index for index, sticker in enumerate(STICKERS)}
+SOLVED_STICKERS = tuple(Color(face.value) for (_, face) in STICKERS)
+FACE_STARTS = range(0, len(STICKERS), 9) # Index of the first sticker of each face; its center is 4 further
+STICKER_CENTERS = tuple(start + 4 for start in FACE_STARTS for _ in range(9))
+
+def face_vector(face):
+    """ Returns the outward unit vector of face as a tuple """
+    ret = [0, 0, 0]
+    ret[abs(face.value) - 1] = 1 if face.value > 0 else -1
+    return tuple(ret)
+
+def vector_face(vector):
+    """ Inverse of face_vector """
+    axis = next(i for i, v in enumerate(vector) if v != 0)
+    return Face((axis + 1) * vector[axis])
+
+def rotate_vector(vector, axis, quarter_turns):
+    """ Rotates vector about coordinate axis (0, 1 or 2) by quarter_turns, clockwise when looking at the positive side """
+    (i, j) = ((axis + 2) % 3, (axis + 1) % 3)
+    ret = list(vector)
+    for _ in range(quarter_turns % 4):
+        ret[i], ret[j] = ret[j], -ret[i]
+    return tuple(ret)
+
+def layer_permutation(face, depths, rotation):
+    """ Permutation that turns the layers at depths (seen from face) by rotation, clockwise as seen from face """
+    axis = abs(face.value) - 1
+    sign = 1 if face.value > 0 else -1
+    layers = {sign * (1 - depth) for depth in depths}
+    quarter_turns = sign * rotation.value
+    perm = list(range(len(STICKERS)))
+    for index, (coordinates, sticker_face) in enumerate(STICKERS):
+        if coordinates[axis] in layers:
+            new_coordinates = rotate_vector(coordinates, axis, quarter_turns)
+            new_face = vector_face(rotate_vector(face_vector(sticker_face), axis, quarter_turns))
+            perm[STICKER_INDEX[(new_coordinates, new_face)]] = index
+    return tuple(perm)
+
+def compose(*perms):
+    """ Returns the single permutation equivalent to applying perms in order """
+    ret = tuple(range(len(STICKERS)))
+    for perm in perms:
+        ret = itemgetter(*perm)(ret)
+    return ret
+
+def invert(perm):
+    """ Returns the inverse of perm """
+    ret = [0] * len(perm)
+    for index, source in enumerate(perm):
+        ret[source] = index
+    return tuple(ret)
+
+def compile_moves():
+    """ Returns {move name: permutation} for every move accepted by RubiksCube.rotate_from_input """
+    moves = {}
+    slice_faces = {Axis.M: Face.L, Axis.E: Face.D, Axis.S: Face.F} # The face each slice turns along with
+    for rotation, notation in NOTATIONS.items():
+        for face in Face:
+            moves[face.name + notation] = layer_permutation(face, DEPTHS[:1], rotation)
+            moves[face.name.lower() + notation] = layer_permutation(face, DEPTHS[:2], rotation)
+        for axis, face in slice_faces.items():
+            moves[axis.name + notation] = layer_permutation(face, DEPTHS[1:2], rotation)
+        for orientation in Orientation:
+            moves[orientation.name + notation] = layer_permutation(Face(orientation.value), DEPTHS, rotation)
+    return moves
+
+# A move is a gather: new_stickers[i] = stickers[perm[i]]
+MOVES = compile_moves()
+MOVE_GATHERS = {name: itemgetter(*perm) for name, perm in MOVES.items()}
+
+def whole_cube_rotations():
+    """ Returns the 24 orientations of the cube as permutations, starting with the identity """
+    rotations = [tuple(range(len(STICKERS)))]
+    for perm in rotations: # Breadth-first closure under x and y
+        for name in ("x", "y"):
+            rotation = compose(perm, MOVES[name])
+            if rotation not in rotations:
+                rotations.append(rotation)
+    return rotations
+
+ROTATIONS = whole_cube_rotations()
+
+def moved_stickers(perm):
+    """ Returns (sticker index, its face center index) for every sticker perm changes, or None if perm moves a center """
+    moved = [index for index, source in enumerate(perm) if index != source]
+    if any(STICKER_CENTERS[index] == index for index in moved):
+        return None
+    return tuple((index, STICKER_CENTERS[index]) for index in moved)
+
+MOVED_STICKERS = {name: moved_stickers(perm) for name, perm in MOVES.items()}
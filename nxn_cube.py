@@ -0,0 +1,225 @@
+""" NxN cubes (2x2 up to 7x7 and beyond) as sticker arrays, with layer-indexed moves such as 2R, Rw, 3Rw and 3r """
+
+import re
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+import facelets
+from algorithm import MAX_MOVES, NOTATIONS, QUARTER_TURNS, cancel_moves, expand_moves, parse_algorithm
+from enums import *
+from move_tables import NOTATIONS as ROTATION_NOTATIONS, STICKER_FACES, face_vector, rotate_vector, vector_face
+from scramble import generate_scrambles
+
+MIN_SIZE = 2
+MOVE_NAME = re.compile(r"(\d*)([URFDLBurfdlbMESxyz])(w?)(['2]?)")
+SLICE_FACES = {"M": Face.L, "E": Face.D, "S": Face.F} # The face each middle slice turns along with
+
+def face_coordinates(face, size):
+    """ Returns the coordinates of the size * size stickers on face, in facelet reading order. Coordinates run
+    from -(size - 1) to size - 1 in steps of 2, so that every sticker has integer coordinates for any size """
+    values = range(1 - size, size, 2)
+    (outer, ascending, descending) = (size - 1, values, values[::-1])
+    match face:
+        case Face.U:
+            return [(col, outer, row) for row in descending for col in ascending]
+        case Face.R:
+            return [(outer, row, col) for row in descending for col in ascending]
+        case Face.F:
+            return [(col, row, -outer) for row in descending for col in ascending]
+        case Face.D:
+            return [(col, -outer, row) for row in ascending for col in ascending]
+        case Face.L:
+            return [(-outer, row, col) for row in descending for col in descending]
+        case Face.B:
+            return [(col, row, outer) for row in descending for col in descending]
+
+@lru_cache(maxsize=None)
+def sticker_layout(size):
+    """ Returns the (coordinates, face) of every sticker of a size x size cube, in URFDLB facelet order """
+    return tuple((coordinates, face) for face in STICKER_FACES for coordinates in face_coordinates(face, size))
+
+@lru_cache(maxsize=None)
+def solved_stickers(size):
+    return tuple(Color(face.value) for (_, face) in sticker_layout(size))
+
+def move_layers(name, size):
+    """ Returns (face, depths, quarter turns) for a move name, depths counted from face (0 is the face itself).
+    2R turns only the second layer, Rw (or r) the outer two, 3Rw (or 3r) the outer three. Raises ValueError """
+    match = MOVE_NAME.fullmatch(name)
+    if match is None:
+        raise ValueError(f"'{name}' is not a valid move")
+    (prefix, letter, wide, notation) = match.groups()
+    count = int(prefix) if prefix else None
+    if count is not None and not 1 <= count <= size:
+        raise ValueError(f"'{name}': layer {count} does not exist on a {size}x{size} cube")
+    if letter in "xyz" or letter in SLICE_FACES:
+        if prefix or wide:
+            raise ValueError(f"'{name}' is not a valid move")
+        if letter in SLICE_FACES:
+            if size % 2 == 0:
+                raise ValueError(f"'{name}': even cubes have no middle slice")
+            return (SLICE_FACES[letter], (size // 2,), QUARTER_TURNS[notation])
+        return (Face(Orientation[letter].value), tuple(range(size)), QUARTER_TURNS[notation])
+    if letter.islower() or wide:
+        if letter.islower() and wide:
+            raise ValueError(f"'{name}' is not a valid move")
+        depths = tuple(range(count or 2))
+    else:
+        depths = (count - 1,) if count else (0,)
+    return (Face[letter.upper()], depths, QUARTER_TURNS[notation])
+
+@lru_cache(maxsize=4096)
+def compile_move(name, size):
+    """ Returns (target indices, gather of their source stickers) for a move: only the O(size) stickers of the
+    turned layers (plus the face itself, when it turns) are touched """
+    (face, depths, quarter_turns) = move_layers(name, size)
+    layout = sticker_layout(size)
+    index = {sticker: i for i, sticker in enumerate(layout)}
+    axis = abs(face.value) - 1
+    sign = 1 if face.value > 0 else -1
+    layers = {sign * (size - 1 - 2 * depth) for depth in depths}
+    turns = sign * quarter_turns
+    (targets, sources) = ([], [])
+    for source, (coordinates, sticker_face) in enumerate(layout):
+        if coordinates[axis] in layers:
+            new_coordinates = rotate_vector(coordinates, axis, turns)
+            new_face = vector_face(rotate_vector(face_vector(sticker_face), axis, turns))
+            targets.append(index[(new_coordinates, new_face)])
+            sources.append(source)
+    return (tuple(targets), itemgetter(*sources))
+
+@lru_cache(maxsize=None)
+def valid_move_names(size):
+    """ Every move name accepted on a size x size cube """
+    bases = ["x", "y", "z"] + (["M", "E", "S"] if size % 2 else [])
+    for face in STICKER_FACES:
+        bases += [face.name, face.name + "w", face.name.lower()]
+        bases += [f"{count}{face.name}" for count in range(1, size + 1)]
+        bases += [f"{count}{face.name}w" for count in range(1, size + 1)]
+        bases += [f"{count}{face.name.lower()}" for count in range(1, size + 1)]
+    return frozenset(base + notation for base in bases for notation in QUARTER_TURNS)
+
+class NxNAlgorithm:
+    """ A move sequence for a size x size cube, with cancellations applied """
+    def __init__(self, text="", size=3, moves=None):
+        self.size = size
+        if moves is None:
+            moves = list(islice(expand_moves(parse_algorithm(text, valid_move_names(size))), MAX_MOVES + 1))
+            if len(moves) > MAX_MOVES:
+                raise ValueError(f"Algorithms on a {size}x{size} cube may expand to at most {MAX_MOVES} moves")
+        self.moves = cancel_moves(moves)
+
+    def __str__(self):
+        return " ".join(self.move_names())
+
+    def __len__(self):
+        return len(self.moves)
+
+    def move_names(self):
+        return [base + NOTATIONS[quarter_turns] for (base, quarter_turns) in self.moves]
+
+    def inverse(self):
+        return NxNAlgorithm(size=self.size, moves=[(base, 4 - quarter_turns) for (base, quarter_turns) in reversed(self.moves)])
+
+    def apply(self, cube):
+        for name in self.move_names():
+            cube.apply_move(name)
+
+@lru_cache(maxsize=1024)
+def compile_algorithm(text, size):
+    return NxNAlgorithm(text, size)
+
+class NxNCube:
+    """ A size x size cube stored as 6 * size * size sticker colors in URFDLB facelet order. Offers the move methods
+    of RubiksCube, so it can be driven by the same gui """
+    def __init__(self, size=4):
+        if size < MIN_SIZE:
+            raise ValueError(f"Cube size must be at least {MIN_SIZE}")
+        self.size = size
+        self.stickers = list(solved_stickers(size))
+
+    def __repr__(self):
+        width = self.size * self.size
+        rows = []
+        for start, face in zip(range(0, len(self.stickers), width), STICKER_FACES):
+            face_stickers = self.stickers[start:start + width]
+            rows.append(f"{face.name}: " + " / ".join("".join(color.name[0] for color in face_stickers[row:row + self.size])
+                                                     for row in range(0, width, self.size)))
+        return "\n".join(rows) + f"\nCurrently {'solved' if self.is_solved() else 'not solved'}."
+
+    def __eq__(self, other):
+        return isinstance(other, NxNCube) and self.stickers == other.stickers
+
+    def to_facelets(self):
+        """ Returns the 6 * size * size letter facelet string of the current state (see facelets.py) """
+        return facelets.to_facelets(self.stickers)
+
+    @classmethod
+    def from_facelets(cls, text):
+        """ Returns a new cube in the state given by a facelet string; the size follows from its length. Raises ValueError """
+        size = round((len(text) / 6) ** 0.5)
+        cube = cls(size)
+        cube.stickers[:] = facelets.from_facelets(text, len(cube.stickers))
+        return cube
+
+    def reset(self):
+        self.stickers[:] = solved_stickers(self.size)
+
+    def recount_solved(self):
+        pass # Nothing is tracked, but History calls this after restoring a snapshot
+
+    def is_solved(self):
+        """ Returns True if every face is a single color """
+        width = self.size * self.size
+        stickers = self.stickers
+        return all(stickers[start:start + width].count(stickers[start]) == width for start in range(0, len(stickers), width))
+
+    def apply_move(self, move_name):
+        """ Applies one move, such as R, 2R', 3Rw2 or x. Raises ValueError for moves that do not exist on this size """
+        (targets, gather) = compile_move(move_name, self.size)
+        stickers = self.stickers
+        for target, color in zip(targets, gather(stickers)):
+            stickers[target] = color
+
+    def apply_algorithm(self, algorithm):
+        """ Applies an NxNAlgorithm, or notation text. Returns the NxNAlgorithm """
+        if not isinstance(algorithm, NxNAlgorithm):
+            algorithm = compile_algorithm(algorithm, self.size)
+        algorithm.apply(self)
+        return algorithm
+
+    def rotate(self, face, rotation):
+        move_name = face.name + ROTATION_NOTATIONS[rotation]
+        self.apply_move(move_name)
+        return f"{move_name} "
+
+    def rotate_axis(self, axis, rotation):
+        move_name = axis.name + ROTATION_NOTATIONS[rotation]
+        self.apply_move(move_name)
+        return f"{move_name} "
+
+    def view(self, orientation, rotation):
+        move_name = orientation.name + ROTATION_NOTATIONS[rotation]
+        self.apply_move(move_name)
+        return f"{move_name} "
+
+    def double_turn(self, face, rotation):
+        move_name = face.name.lower() + ROTATION_NOTATIONS[rotation]
+        self.apply_move(move_name)
+        return f"{move_name} "
+
+    def randomize(self, num_rotations, seed=None):
+        """ Randomizes the cube with num_rotations outer-block turns of every width up to half the cube """
+        scramble = next(generate_scrambles(1, num_rotations, seed, size=self.size))
+        self.apply_algorithm(NxNAlgorithm(scramble, self.size))
+        return f"{scramble} "
+
+    def rotate_from_input(self, user_input, reverse=False):
+        """ Applies one move given in notation. Returns success value as boolean """
+        if reverse:
+            user_input = user_input[:-1] if user_input.endswith("'") else user_input if user_input.endswith("2") else user_input + "'"
+        try:
+            self.apply_move(user_input)
+        except ValueError:
+            return False
+        return True
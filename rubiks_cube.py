@@ -1,14 +1,63 @@
 """ The Rubik's Cube class """
 
-import random
-import block, utilities
+import os
+from operator import itemgetter
+import block, cubie, facelets, solver, symmetry, utilities, validation
+from algorithm import Algorithm, compile_algorithm
+from cache import cached_query
 from enums import *
 from gui_constants import *
+from move_tables import FACE_STARTS, MOVE_GATHERS, MOVED_STICKERS, MOVES, NOTATIONS, SOLVED_STICKERS, STICKERS
+from scramble import generate_scrambles
+
+# Blocks never change position (only their colors move), so both indexes are fixed
+BLOCK_POSITIONS = [(x, y, z) for x in range(-1, 2) for y in range(-1, 2) for z in range(-1, 2)]
+BLOCK_FACE_INDEX = {frozenset(block.position_layout(*position)[2]): index for index, position in enumerate(BLOCK_POSITIONS)}
 
 class RubiksCube:
     """ Class representing a 3x3 Rubik's Cube """
-    def __init__(self):
-        self.blocks = [block.Block(i, j, k) for i in range(-1, 2) for j in range(-1, 2) for k in range(-1, 2)]
+    size = 3
+    query_cache = None # A cache.StateCache here (on the class or one cube) caches the results of solution()
+
+    def __init__(self, track_solved=False, lazy=False):
+        self._stickers = list(SOLVED_STICKERS) # 54 colors in URFDLB facelet order, read by every Block through the cube
+        # With lazy, moves are composed into one pending permutation that is applied when the stickers are next read
+        self._lazy = lazy
+        self.pending = None
+        self._blocks = None # Built on first use: a cube that is only turned and queried never needs them
+        # With track_solved, the number of stickers matching their face center is kept up to date by every move
+        self.solved_count = len(self._stickers) if track_solved else None
+
+    @property
+    def blocks(self):
+        """ The 27 Blocks, ordered by x, then y, then z. They are views onto the sticker array """
+        if self._blocks is None:
+            self._blocks = [block.Block(x, y, z, cube=self) for (x, y, z) in BLOCK_POSITIONS]
+        return self._blocks
+
+    @property
+    def lazy(self):
+        """ Are moves composed into a pending permutation? Turning it off applies the pending moves first """
+        return self._lazy
+
+    @lazy.setter
+    def lazy(self, lazy):
+        if not lazy and self.pending is not None:
+            self.flush()
+        self._lazy = lazy
+
+    @property
+    def stickers(self):
+        """ The sticker array, with any pending moves applied first. Edit it in place (stickers[:] = ...) """
+        if self.pending is not None:
+            self.flush()
+        return self._stickers
+
+    def flush(self):
+        """ Applies the pending moves of a lazy cube to its sticker array """
+        (pending, self.pending) = (self.pending, None)
+        self._stickers[:] = itemgetter(*pending)(self._stickers)
+        self.recount_solved()
                     
     def __repr__(self):
         blocks_str = ""
@@ -18,23 +67,75 @@ class RubiksCube:
                 blocks_str += "\n"
         return f"\n{blocks_str}Currently {'solved' if self.is_solved() else 'not solved'}."
     
+    def __eq__(self, other):
+        return isinstance(other, RubiksCube) and self.stickers == other.stickers
+
+    def __hash__(self):
+        """ Hash of the current state: do not move a cube while it is a set member or dict key """
+        try:
+            return hash(self.to_bytes())
+        except ValueError: # Hand-edited cubes that are not made of real pieces
+            return hash(tuple(self.stickers))
+
+    def to_bytes(self):
+        """ Returns the state packed into cubie.STATE_BYTES bytes (orientation, corner and edge permutation and orientation) """
+        return cubie.encode_stickers(self.stickers)
+
+    @classmethod
+    def from_bytes(cls, data, track_solved=False):
+        """ Returns a new cube in the state encoded by to_bytes """
+        return cls.from_stickers(cubie.decode_stickers(data), track_solved)
+
+    def to_facelets(self):
+        """ Returns the 54-letter facelet string of the current state (see facelets.py) """
+        return facelets.to_facelets(self.stickers)
+
+    @classmethod
+    def from_facelets(cls, text, track_solved=False):
+        """ Returns a new cube in the state given by a 54-letter facelet string. Raises ValueError """
+        return cls.from_stickers(facelets.from_facelets(text), track_solved)
+
+    @classmethod
+    def from_stickers(cls, stickers, track_solved=False):
+        """ Returns a new cube with a copy of a 54-sticker array (see stickers). The state is not validated """
+        cube = cls(track_solved)
+        cube.stickers[:] = stickers
+        cube.recount_solved()
+        return cube
+
+    def canonical_key(self):
+        """ Returns a 54-byte key shared by every state equal to this one up to cube symmetry (see symmetry.canonical_form) """
+        return symmetry.canonical_key(self.stickers)
+
+    def canonical(self):
+        """ Returns a new cube in the canonical representative of this state's symmetry class. The cube is not moved """
+        cube = RubiksCube(self.solved_count is not None)
+        cube.stickers[:] = symmetry.key_stickers(self.canonical_key())
+        cube.recount_solved()
+        return cube
+
+    @cached_query("solution")
+    def solution(self, max_length=None, timeout=None):
+        """ Returns a solution for the current state (see solver.solve), from query_cache if it is set """
+        return solver.solve(self, max_length, timeout)
+
     def get_blocks(self):
         """ Returns array of Blocks """
         return self.blocks
     
     def get_block(self, x, y, z):
         """ Returns a single block given its coordinates """
-        try:
-            return next(block for block in self.blocks if block.get_x_y_z() == (x, y, z))
-        except StopIteration:
-            return None
+        if -1 <= x <= 1 and -1 <= y <= 1 and -1 <= z <= 1:
+            return self.blocks[9 * x + 3 * y + z + 13]
+        return None
         
     def get_block_from_face_colors(self, face_colors):
         """ Returns a single block given its colors """
-        try:
-            return next(block for block in self.blocks if block.get_colors() == face_colors)
-        except StopIteration:
-            return None
+        index = BLOCK_FACE_INDEX.get(frozenset(face_colors)) # The faces alone determine which block it could be
+        block = self.blocks[index] if index is not None else None
+        if block and all(block.get_color(face) == color for face, color in face_colors.items()):
+            return block
+        return None
     
     def get_face(self, face):
         """ Returns list of Blocks that are currently on face *face* """
@@ -54,9 +155,10 @@ class RubiksCube:
 
     def reset(self):
         """ Resets all blocks to initial position """
-        for block in self.blocks:
-            (x, y, z) = block.get_x_y_z()
-            block.set_colors(block.compute_initial_colors(x, y, z))
+        self.pending = None
+        self._stickers[:] = SOLVED_STICKERS
+        if self.solved_count is not None:
+            self.solved_count = len(self._stickers)
 
     def white_on_top(self):
         """ Is the white middle square on top? """
@@ -105,150 +207,104 @@ class RubiksCube:
                 moves += "y2 "
         return moves
         
+    def validate(self):
+        """ Returns None if a real cube can be in this state, otherwise a description of what makes it impossible """
+        return validation.check_stickers(self.stickers)
+
+    def count_solved_stickers(self):
+        """ Returns the number of stickers that match the center of their face """
+        stickers = self.stickers
+        return sum(stickers[start:start + 9].count(stickers[start + 4]) for start in FACE_STARTS)
+
+    def recount_solved(self):
+        """ Resynchronizes the tracked solved count after the stickers were edited directly """
+        if self.solved_count is not None:
+            self.solved_count = self.count_solved_stickers()
+
     def is_solved(self):
-        """ Returns True if the cube is solved, False otherwise. """
-        ret = True
-        moves = self.reorient().split()
-        moves.reverse()
-        for block in self.blocks:
-            if not block.is_solved():
-                ret = False 
-        for move in moves:
-            self.rotate_from_input(move, reverse=True)
-        return ret
+        """ Returns True if the cube is solved, False otherwise. Does not depend on, or change, the orientation """
+        if self.pending is not None:
+            self.flush()
+        stickers = self._stickers
+        if self.solved_count is not None:
+            return self.solved_count == len(stickers)
+        return all(stickers[start:start + 9].count(stickers[start + 4]) == 9 for start in FACE_STARTS)
     
+    def apply_move(self, move_name):
+        """ Applies a compiled move (see move_tables.MOVES) to the sticker array, or to the pending permutation if lazy """
+        if self._lazy:
+            self.pending = MOVE_GATHERS[move_name](self.pending) if self.pending is not None else MOVES[move_name]
+            return
+        stickers = self._stickers
+        if self.solved_count is None:
+            stickers[:] = MOVE_GATHERS[move_name](stickers)
+            return
+        moved = MOVED_STICKERS[move_name]
+        if moved is None: # Centers move too, so every sticker may change status
+            stickers[:] = MOVE_GATHERS[move_name](stickers)
+            self.solved_count = self.count_solved_stickers()
+            return
+        before = sum(stickers[index] == stickers[center] for index, center in moved)
+        stickers[:] = MOVE_GATHERS[move_name](stickers)
+        self.solved_count += sum(stickers[index] == stickers[center] for index, center in moved) - before
+
+    def apply_gather(self, gather):
+        """ Applies a compiled permutation (an itemgetter over sticker indices) to the sticker array """
+        if self._lazy:
+            self.pending = gather(self.pending if self.pending is not None else range(len(STICKERS)))
+            return
+        self._stickers[:] = gather(self._stickers)
+        self.recount_solved()
+
+    def apply_algorithm(self, algorithm):
+        """ Applies an Algorithm, or notation text compiled through the algorithm cache. Returns the Algorithm """
+        if not isinstance(algorithm, Algorithm):
+            algorithm = compile_algorithm(algorithm)
+        algorithm.apply(self)
+        return algorithm
+
     def rotate(self, face, rotation):
         """ Rotates face on cube by rotation """
-        # print(f"Now rotating {face.name} face - rotation: {rotation.name}")
-        blocks_affected = [block for block in self.get_face(face) if not block.get_block_type() == BlockType.MIDDLE]
-        todo = {}
-        for block in blocks_affected:
-            rel = block.relative_coordinates(face)
-            new = utilities.new_x_y(rel, rotation)
-            (x, y, z) = utilities.absolute_coordinates(new, face)
-            from_block = self.get_block(x, y, z)
-            new_colors = block.get_new_colors(face, from_block.get_colors())
-            todo.update({block: new_colors})
-        for block, new_colors in todo.items():
-            block.set_colors(new_colors)
-            
-        if rotation == Rotation.CCW:
-            notation = "'"
-        elif rotation == Rotation.DOUBLE:
-            notation = "2"
-        else:
-            notation = ""
-        return f"{face.name + notation} "
+        move_name = face.name + NOTATIONS[rotation]
+        self.apply_move(move_name)
+        return f"{move_name} "
         
     def rotate_axis(self, axis, rotation):
         """ Rotates axis on cube by rotation """
-        # print(f"Now rotating {axis.name} axis - rotation: {rotation.name}")
-        blocks_affected = [block for block in self.get_axis(axis) if not block.get_block_type() == BlockType.CENTER]
-        todo = {}
-        for block in blocks_affected:
-            rel = block.relative_coordinates_axis(axis)
-            new = utilities.new_x_y(rel, rotation)
-            (x, y, z) = utilities.absolute_coordinates_axis(new, axis)
-            from_block = self.get_block(x, y, z)
-            new_colors = block.get_new_colors_axis(from_block.get_colors())
-            todo.update({block: new_colors})
-        for block, new_colors in todo.items():
-            block.set_colors(new_colors)
-            
-        if rotation == Rotation.CCW:
-            notation = "'"
-        elif rotation == Rotation.DOUBLE:
-            notation = "2"
-        else:
-            notation = ""
-        return f"{axis.name + notation} "
+        move_name = axis.name + NOTATIONS[rotation]
+        self.apply_move(move_name)
+        return f"{move_name} "
             
     def view(self, orientation, rotation):
         """ Changes the view on the orientation axis """
-        match rotation:
-            case Rotation.CCW:
-                new_ccw_rotation = Rotation.CW
-                new_cw_rotation = Rotation.CCW
-            case Rotation.CW:
-                new_ccw_rotation = Rotation.CCW
-                new_cw_rotation = Rotation.CW
-            case Rotation.DOUBLE:
-                new_ccw_rotation = Rotation.DOUBLE
-                new_cw_rotation = Rotation.DOUBLE
-        
-        match orientation:
-            case Orientation.x:
-                self.rotate(Face.L, new_ccw_rotation)
-                self.rotate_axis(Axis.M, new_ccw_rotation)
-                self.rotate(Face.R, new_cw_rotation)
-            case Orientation.y:
-                self.rotate(Face.U, new_cw_rotation)
-                self.rotate_axis(Axis.E, new_ccw_rotation)
-                self.rotate(Face.D, new_ccw_rotation)
-            case Orientation.z:
-                self.rotate(Face.F, new_cw_rotation)
-                self.rotate_axis(Axis.S, new_cw_rotation)
-                self.rotate(Face.B, new_ccw_rotation)
-        
-        if rotation == Rotation.CCW:
-            notation = "'"
-        elif rotation == Rotation.DOUBLE:
-            notation = "2"
-        else:
-            notation = ""
-        return f"{orientation.name + notation} "
+        move_name = orientation.name + NOTATIONS[rotation]
+        self.apply_move(move_name)
+        return f"{move_name} "
     
     def double_turn(self, face, rotation):
         """ Rotates two layers at once, face and the axis parallel to it """
-        self.rotate(face, rotation)
-        axis = next(axis for axis in Axis if axis.value == abs(face.value))
-        self.rotate_axis(axis, Rotation.negative(rotation) if face.value > 0 else rotation)
-        
-        if rotation == Rotation.CCW:
-            notation = "'"
-        elif rotation == Rotation.DOUBLE:
-            notation = "2"
-        else:
-            notation = ""
-        return f"{face.name.lower() + notation} "
+        move_name = face.name.lower() + NOTATIONS[rotation]
+        self.apply_move(move_name)
+        return f"{move_name} "
                  
-    def randomize(self, num_rotations):
-        """ Randomizes the cube with num_rotations """
-        random.seed()
-        log = ""
-        random_face = random.choice(list(Face))
-        for _ in range(num_rotations):
-            random_face = random.choice([face for face in list(Face) if face != random_face])
-            random_rotation = random.choice(list(Rotation))
-            log += self.rotate(random_face, random_rotation)
-        return f"{log}"
+    def randomize(self, num_rotations, seed=None):
+        """ Randomizes the cube with num_rotations face turns. Pass seed for a reproducible scramble """
+        scramble = next(generate_scrambles(1, num_rotations, seed))
+        Algorithm(scramble).apply(self) # Not compile_algorithm: random scrambles would only churn its cache
+        return f"{scramble} "
     
     def rotate_from_input(self, user_input, reverse=False):
         """ Rotates the cube based on standard rubik's cube notation. Returns success value as boolean """
         if len(user_input) > 2:
             return False
-        if len(user_input) == 2 and user_input[-1] == "'":
-            move_type = Rotation.CCW if not reverse else Rotation.CW
-            move_name = user_input[:-1]  # Remove the apostrophe
-        elif len(user_input) == 2 and user_input[-1] == '2':
-            move_type = Rotation.DOUBLE
-            move_name = user_input[:-1]  # Remove the '2'
-        else:
-            move_type = Rotation.CW if not reverse else Rotation.CCW
-            move_name = user_input
-            
-        if move_name in [face.name for face in Face]:
-            self.rotate(Face[move_name], move_type)
-        elif move_name in [face.name.lower() for face in Face]:
-            move_name = move_name.upper()
-            self.double_turn(Face[move_name], move_type)
-        elif move_name in [axis.name for axis in Axis]:
-            self.rotate_axis(Axis[move_name], move_type)
-        elif move_name in [orientation.name for orientation in Orientation]:
-            self.view(Orientation[move_name], move_type)
-        else:
-            # print(f"{move_name} is not a valid move!")
+        if reverse and len(user_input) == 2 and user_input[-1] == "'":
+            user_input = user_input[:-1]
+        elif reverse and len(user_input) == 1:
+            user_input += "'"
+        if user_input not in MOVE_GATHERS:
+            # print(f"{user_input} is not a valid move!")
             return False
+        self.apply_move(user_input)
         return True
         
     def set_block_colors(self):
@@ -272,6 +328,7 @@ class RubiksCube:
             
             curr_color = next(c for c in Color if c.name == color or c.name[0] == color)
             block.set_color(face, curr_color)
+        self.recount_solved()
 
     def draw(self, canvas):
         """ On canvas, draws each square of the front, top, and side faces according to the color specified in cube """
@@ -282,3 +339,7 @@ class RubiksCube:
                 color = self.get_block(x, y, z).get_colors()[face]
                 points = list(sum(square, ())) # Flatten array of tuples
                 canvas.create_polygon(points, outline='#111', fill=color.name, width=3)
+
+if os.environ.get("RUBIKS_STATS"):
+    import instrumentation # Imported here, once RubiksCube exists, because it wraps its methods
+    instrumentation.enable_from_environment()
@@ -0,0 +1,68 @@
+""" Reproducible, streaming scramble generation """
+
+import argparse
+import random
+import sys
+from enums import *
+from move_tables import NOTATIONS
+
+DEFAULT_LENGTH = 25
+WRITE_BATCH = 4096 # Scrambles joined per write call
+MOVE_SETS = ("faces", "all")
+
+def layer_names(move_set, size=3):
+    """ Names of the layers a move set turns. On a 3x3: 'faces' (R, U, ...) or 'all' (faces, M/E/S slices and wide r, u, ...).
+    On other sizes: 'faces' turns outer blocks of every width up to half the cube (R, Rw, 3Rw, ...), and 'all' adds
+    the single inner layers (2R, 3R, ...) """
+    if move_set not in MOVE_SETS:
+        raise ValueError(f"Unknown move set '{move_set}', expected 'faces' or 'all'")
+    faces = [face.name for face in Face]
+    if size == 3:
+        return faces + [axis.name for axis in Axis] + [face.lower() for face in faces] if move_set == "all" else faces
+    names = faces + [face + "w" for face in faces] * (size >= 4) + [f"{width}{face}w" for width in range(3, size // 2 + 1) for face in faces]
+    if move_set == "all":
+        names += [f"{depth}{face}" for depth in range(2, size // 2 + 1) for face in faces]
+    return names
+
+def generate_scrambles(count, length=DEFAULT_LENGTH, seed=None, move_set="faces", size=3):
+    """ Lazily yields count scrambles of length moves for a size x size cube as notation strings. The same seed always
+    gives the same scrambles. Uses its own random.Random, so the global random state is left alone. A layer is never
+    turned twice in a row """
+    rng = random.Random(seed)
+    layers = layer_names(move_set, size)
+    moves = [[layer + notation for notation in NOTATIONS.values()] for layer in layers]
+    # follow_ups[i] holds every move that may come after a turn of layer i; the last entry serves the first move
+    follow_ups = [[(j, move) for j in range(len(layers)) if j != i for move in moves[j]] for i in range(len(layers))]
+    follow_ups.append([(j, move) for j in range(len(layers)) for move in moves[j]])
+    choice = rng.choice
+    for _ in range(count):
+        last = -1
+        scramble = []
+        for _ in range(length):
+            (last, move) = choice(follow_ups[last])
+            scramble.append(move)
+        yield " ".join(scramble)
+
+def write_scrambles(file, count, length=DEFAULT_LENGTH, seed=None, move_set="faces", size=3):
+    """ Writes count scrambles to an open text file, one per line """
+    scrambles = generate_scrambles(count, length, seed, move_set, size)
+    while batch := [scramble for _, scramble in zip(range(WRITE_BATCH), scrambles)]:
+        file.write("\n".join(batch) + "\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Write reproducible scrambles, one per line")
+    parser.add_argument("count", type=int, help="number of scrambles")
+    parser.add_argument("-n", "--length", type=int, default=DEFAULT_LENGTH, help="moves per scramble (default: %(default)s)")
+    parser.add_argument("-s", "--seed", type=int, default=None, help="seed for reproducible output")
+    parser.add_argument("-m", "--moves", choices=MOVE_SETS, default="faces", help="move set (default: %(default)s)")
+    parser.add_argument("--size", type=int, default=3, help="cube size (default: %(default)s)")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    args = parser.parse_args()
+    if args.output:
+        with open(args.output, "w") as file:
+            write_scrambles(file, args.count, args.length, args.seed, args.moves, args.size)
+    else:
+        write_scrambles(sys.stdout, args.count, args.length, args.seed, args.moves, args.size)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+""" Local asyncio HTTP service: apply algorithms to states, verify solutions and solve, with /metrics.
+Standard library only. Run with: python service.py [--port 8080] """
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import batch, batch_solver, cubie, solver
+from cache import MISSING, StateCache
+from rubiks_cube import RubiksCube
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+MAX_BODY = 1 << 20 # Bytes per request body
+BATCH_SIZE = 256 # Queued apply/verify jobs run back to back before yielding to the event loop
+QUEUE_SIZE = 1024 # Queued apply/verify jobs before new ones are rejected with 503
+SOLVES_PER_WORKER = 8 # Queued solves per worker process before new ones are rejected with 503
+MAX_SOLVE_TIMEOUT = 10.0 # Seconds a request may ask the solver to spend, and the budget of requests that do not ask
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error", 503: "Service Unavailable"}
+ENDPOINTS = ("/apply", "/verify", "/solve", "/metrics")
+
+class HttpError(Exception):
+    """ Ends a request with an HTTP error status """
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def apply_record(cube, record):
+    """ {"state" (hex, optional), "moves"} -> {"state", "solved"}, see batch.process_record """
+    return batch.process_record(cube, record)
+
+def verify_record(cube, record):
+    """ {"state" (hex, optional), "scramble", "solution"} -> {"solved"}: whether solution solves the scrambled state """
+    start = time.perf_counter()
+    result = {"id": record["id"]} if "id" in record else {}
+    try:
+        scrambled = batch.process_record(cube, {"state": record.get("state"), "moves": record.get("scramble", "")})
+        if "error" in scrambled:
+            raise ValueError(scrambled["error"])
+        cube.apply_algorithm(record.get("solution", ""))
+        result["solved"] = cube.is_solved()
+    except (ValueError, TypeError, AttributeError) as error:
+        result["error"] = str(error)
+    result["seconds"] = round(time.perf_counter() - start, 6)
+    return result
+
+def solve_limits(record):
+    """ Returns the (max_length, timeout) of a solve record, with timeout capped at MAX_SOLVE_TIMEOUT. Raises HttpError """
+    (max_length, timeout) = (record.get("max_length"), record.get("timeout"))
+    if max_length is not None and (type(max_length) is not int or max_length <= 0):
+        raise HttpError(400, "max_length must be a positive whole number")
+    if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not timeout > 0):
+        raise HttpError(400, "timeout must be a positive number of seconds")
+    return (max_length, MAX_SOLVE_TIMEOUT if timeout is None else min(timeout, MAX_SOLVE_TIMEOUT))
+
+def solve_state(state, max_length, timeout):
+    """ Runs in a worker process: returns a solution for a state encoded by RubiksCube.to_bytes (hex) """
+    try:
+        return {"solution": solver.solve_stickers(cubie.decode_stickers(bytes.fromhex(state)), max_length, timeout)}
+    except (ValueError, TimeoutError) as error:
+        return {"error": str(error)}
+
+class Metrics:
+    """ Counters reported by /metrics in the Prometheus text format """
+    def __init__(self):
+        self.requests = dict.fromkeys(ENDPOINTS, 0)
+        self.errors = dict.fromkeys(ENDPOINTS, 0)
+        self.seconds = dict.fromkeys(ENDPOINTS, 0.0)
+        self.rejected = 0
+        self.batches = 0
+        self.batched_jobs = 0
+
+    def record(self, endpoint, status, seconds):
+        if endpoint in self.requests:
+            self.requests[endpoint] += 1
+            self.errors[endpoint] += status != 200
+            self.seconds[endpoint] += seconds
+        self.rejected += status == 503
+
+class CubeService:
+    """ Request handling. Apply and verify jobs are cheap, so they run on the event loop, in batches drained from
+    a bounded queue. Solves run in a pool of worker processes, with a bounded number in flight """
+    def __init__(self, workers=None, solve=True, cache_size=None):
+        self.metrics = Metrics()
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        self.job_runner = None # The run_jobs task, started (and restarted, should it ever end) by run_records
+        self.cube = RubiksCube() # Reused by every apply/verify job
+        self.workers = workers or os.cpu_count()
+        self.executor = None
+        if solve:
+            batch_solver.ensure_table_file()
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=batch_solver.attach_tables)
+        self.pending_solves = 0
+        self.solutions = StateCache(**({"max_entries": cache_size} if cache_size else {}))
+
+    async def run_jobs(self):
+        """ Drains the job queue, running up to BATCH_SIZE jobs per turn of the event loop """
+        queue = self.queue
+        while True:
+            jobs = [await queue.get()]
+            while len(jobs) < BATCH_SIZE and not queue.empty():
+                jobs.append(queue.get_nowait())
+            for (function, records, future) in jobs:
+                if future.cancelled():
+                    continue
+                try:
+                    future.set_result([function(self.cube, record) for record in records])
+                except Exception as error: # Fails this request only; the queue keeps draining
+                    self.cube.reset()
+                    future.set_exception(HttpError(500, f"Internal error: {type(error).__name__}: {error}"))
+            self.metrics.batches += 1
+            self.metrics.batched_jobs += len(jobs)
+            await asyncio.sleep(0)
+
+    async def run_records(self, function, records):
+        if self.queue.full():
+            raise HttpError(503, "Too many queued requests, retry later")
+        if self.job_runner is None or self.job_runner.done():
+            self.job_runner = asyncio.create_task(self.run_jobs())
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((function, records, future))
+        return await future
+
+    async def solve_records(self, records):
+        if self.executor is None:
+            raise HttpError(404, "Solving is disabled on this server")
+        if self.pending_solves + len(records) > self.workers * SOLVES_PER_WORKER:
+            raise HttpError(503, "Too many solves in progress, retry later")
+        limits = [solve_limits(record) for record in records] # Checked up front, so no solve starts for a rejected request
+        self.pending_solves += len(records)
+        try:
+            return await asyncio.gather(*(self.solve_record(record, *limit) for record, limit in zip(records, limits)))
+        finally:
+            self.pending_solves -= len(records)
+
+    async def solve_record(self, record, max_length, timeout):
+        """ {"state" (hex, optional), "scramble" (optional), "max_length", "timeout"} -> {"solution", "length"} """
+        start = time.perf_counter()
+        scrambled = apply_record(self.cube, {"state": record.get("state"), "moves": record.get("scramble", "")})
+        result = {"id": record["id"]} if "id" in record else {}
+        if "error" in scrambled:
+            result["error"] = scrambled["error"]
+        else:
+            key = f"{max_length},{timeout}:{scrambled['state']}".encode()
+            solved = self.solutions.get(key)
+            if solved is MISSING:
+                solved = await asyncio.get_running_loop().run_in_executor(self.executor, solve_state, scrambled["state"], max_length, timeout)
+                if "solution" in solved: # Failures may depend on the time budget, so only solutions are cached
+                    self.solutions.put(key, solved)
+            result.update(solved)
+            if "solution" in solved:
+                result["length"] = len(solved["solution"].split())
+        result["seconds"] = round(time.perf_counter() - start, 6)
+        return result
+
+    async def route(self, method, path, body):
+        """ Returns the response body for a request, raising HttpError for failures """
+        if path == "/metrics":
+            if method != "GET":
+                raise HttpError(405, "Use GET")
+            return self.metrics_text()
+        if path not in ENDPOINTS:
+            raise HttpError(404, f"Unknown endpoint {path}")
+        if method != "POST":
+            raise HttpError(405, "Use POST with a JSON object, or a list of them")
+        try:
+            payload = json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError) as error:
+            raise HttpError(400, f"Invalid JSON: {error}")
+        records = payload if isinstance(payload, list) else [payload]
+        if not all(isinstance(record, dict) for record in records):
+            raise HttpError(400, "Each record must be a JSON object")
+        match path:
+            case "/apply":
+                results = await self.run_records(apply_record, records)
+            case "/verify":
+                results = await self.run_records(verify_record, records)
+            case "/solve":
+                results = await self.solve_records(records)
+        return results if isinstance(payload, list) else results[0]
+
+    def metrics_text(self):
+        metrics = self.metrics
+        lines = []
+        for (name, values) in (("requests_total", metrics.requests), ("request_errors_total", metrics.errors), ("request_seconds_total", metrics.seconds)):
+            lines += [f'rubiks_{name}{{endpoint="{endpoint}"}} {value}' for endpoint, value in values.items()]
+        lines += [f"rubiks_rejected_total {metrics.rejected}", f"rubiks_batches_total {metrics.batches}",
+                  f"rubiks_batched_jobs_total {metrics.batched_jobs}", f"rubiks_queue_depth {self.queue.qsize()}",
+                  f"rubiks_pending_solves {self.pending_solves}"]
+        lines += [f"rubiks_solution_cache_{name} {value}" for name, value in self.solutions.stats().items()]
+        return "\n".join(lines) + "\n"
+
+    async def handle_connection(self, reader, writer):
+        """ Serves HTTP/1.1 requests on one connection, keeping it open between requests unless asked not to """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                start = time.perf_counter()
+                (method, path, version) = (request_line.decode("latin-1").split() + ["", "", ""])[:3]
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    (name, _, value) = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                try:
+                    content_length = headers.get("content-length", "0")
+                    length = int(content_length) if content_length.isdigit() else -1
+                    if not 0 <= length <= MAX_BODY:
+                        keep_alive = False # The body is not read, so the connection can not be reused
+                        raise HttpError(413 if length > MAX_BODY else 400, f"Content-Length must be a number up to {MAX_BODY}")
+                    body = await reader.readexactly(length) if length else b""
+                    (status, response) = (200, await self.route(method, path.partition("?")[0], body))
+                except HttpError as error:
+                    (status, response) = (error.status, {"error": str(error)})
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as error: # A bug must not leave the client waiting for a response
+                    (status, response) = (500, {"error": f"Internal error: {type(error).__name__}: {error}"})
+                self.write_response(writer, status, response, keep_alive)
+                self.metrics.record(path.partition("?")[0], status, time.perf_counter() - start)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def write_response(self, writer, status, response, keep_alive):
+        if isinstance(response, str):
+            (content_type, data) = ("text/plain; version=0.0.4", response.encode())
+        else:
+            (content_type, data) = ("application/json", json.dumps(response).encode())
+        connection = "" if keep_alive else "Connection: close\r\n"
+        writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: {content_type}\r\nContent-Length: {len(data)}\r\n"
+                     f"{connection}\r\n".encode() + data)
+
+    def close(self):
+        if self.job_runner is not None:
+            self.job_runner.cancel()
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, solve=True, cache_size=None):
+    service = CubeService(workers, solve, cache_size)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Serving on http://{host}:{port} ({', '.join(ENDPOINTS)})", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve /apply, /verify, /solve and /metrics over HTTP on this machine")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to listen on (default: %(default)s)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="solver processes (default: one per CPU)")
+    parser.add_argument("--no-solve", action="store_true", help="disable /solve, so no solver tables are loaded")
+    parser.add_argument("--cache-size", type=int, default=None, help="solutions kept in memory")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, not args.no_solve, args.cache_size))
+    except KeyboardInterrupt:
+        pass
+    except ValueError as error: # A stale or corrupted solver table file
+        parser.exit(1, f"{error}\n")
+
+if __name__ == "__main__":
+    main()
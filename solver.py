@@ -0,0 +1,221 @@
+""" Two-phase (Kociemba) solver for the Rubik's Cube """
+
+import os
+import time
+from array import array
+from cubie import *
+from tables import open_tables
+
+# Phase 1 brings the cube into the subgroup <U, D, R2, F2, L2, B2>, phase 2 solves it using only those moves
+PHASE2_MOVES = (0, 1, 2, 4, 7, 9, 10, 11, 13, 16) # U, U2, U', R2, F2, D, D2, D', L2, B2
+MAX_PHASE2_LENGTH = 18
+MAX_LENGTH = 30 # Every cube has a two-phase solution at most this long
+UNKNOWN = 255
+TABLES_VERSION = 1 # Bump whenever the coordinates or table layout change
+TABLES_FILE = "solver_tables.bin"
+
+class SolverTables:
+    """ Move tables (coordinate * N_MOVES + move -> new coordinate) and pruning tables (distance to phase goal) """
+    NAMES = ("twist_move", "flip_move", "slice_move", "corners_move", "ud_edges_move", "slice_sorted_move",
+             "slice_twist_prune", "slice_flip_prune", "corners_prune", "ud_edges_prune")
+
+    def __init__(self, tables):
+        missing = [name for name in self.NAMES if name not in tables]
+        if missing:
+            raise ValueError(f"Missing solver tables: {', '.join(missing)}")
+        for name in self.NAMES:
+            setattr(self, name, tables[name])
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.NAMES}
+
+    @classmethod
+    def build(cls):
+        """ Computes every table in memory. Takes several seconds """
+        tables = {}
+        tables["twist_move"] = build_move_table(N_TWIST, CubieCube.set_twist, CubieCube.get_twist, CubieCube.multiply_corners)
+        tables["flip_move"] = build_move_table(N_FLIP, CubieCube.set_flip, CubieCube.get_flip, CubieCube.multiply_edges)
+        tables["slice_move"] = build_move_table(N_SLICE, CubieCube.set_slice, CubieCube.get_slice, CubieCube.multiply_edges)
+        tables["corners_move"] = build_move_table(N_CORNERS, CubieCube.set_corners, CubieCube.get_corners, CubieCube.multiply_corners, PHASE2_MOVES)
+        tables["ud_edges_move"] = build_move_table(N_UD_EDGES, CubieCube.set_ud_edges, CubieCube.get_ud_edges, CubieCube.multiply_edges, PHASE2_MOVES)
+        tables["slice_sorted_move"] = build_move_table(N_SLICE_SORTED, CubieCube.set_slice_sorted, CubieCube.get_slice_sorted, CubieCube.multiply_edges, PHASE2_MOVES)
+        tables["slice_twist_prune"] = build_pruning_table(tables["slice_move"], tables["twist_move"], N_SLICE, N_TWIST, range(N_MOVES))
+        tables["slice_flip_prune"] = build_pruning_table(tables["slice_move"], tables["flip_move"], N_SLICE, N_FLIP, range(N_MOVES))
+        tables["corners_prune"] = build_pruning_table(tables["slice_sorted_move"], tables["corners_move"], N_SLICE_SORTED, N_CORNERS, PHASE2_MOVES)
+        tables["ud_edges_prune"] = build_pruning_table(tables["slice_sorted_move"], tables["ud_edges_move"], N_SLICE_SORTED, N_UD_EDGES, PHASE2_MOVES)
+        return cls(tables)
+
+    @classmethod
+    def load(cls, path, verify=True):
+        """ Memory-maps the tables written by 'python tables.py build'. Processes mapping the same file share one copy
+        in the page cache. With verify, the checksum is checked first, which reads the whole file once (a few ms) """
+        return cls(open_tables(path, TABLES_VERSION, verify))
+
+def build_move_table(size, set_coordinate, get_coordinate, multiply, moves=range(N_MOVES)):
+    """ Tabulates how each of moves changes a coordinate. Moves left out keep 0 """
+    table = array('H', bytes(2 * size * N_MOVES))
+    cube = CubieCube()
+    for index in range(size):
+        set_coordinate(cube, index)
+        for move in moves:
+            state = cube.copy()
+            multiply(state, MOVE_CUBES[move])
+            table[N_MOVES * index + move] = get_coordinate(state)
+    return table
+
+def build_pruning_table(move1, move2, size1, size2, moves):
+    """ Breadth-first distances from the goal (0, 0) for the pair coordinate index1 * size2 + index2 """
+    table = bytearray([UNKNOWN]) * (size1 * size2)
+    table[0] = 0
+    frontier = [0]
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for index in frontier:
+            (index1, index2) = divmod(index, size2)
+            (row1, row2) = (N_MOVES * index1, N_MOVES * index2)
+            for move in moves:
+                new_index = move1[row1 + move] * size2 + move2[row2 + move]
+                if table[new_index] == UNKNOWN:
+                    table[new_index] = depth
+                    next_frontier.append(new_index)
+        frontier = next_frontier
+    return table
+
+_tables = None
+
+def tables_path():
+    """ Location of the table file: $RUBIKS_SOLVER_TABLES, or solver_tables.bin next to this module """
+    return os.environ.get("RUBIKS_SOLVER_TABLES", os.path.join(os.path.dirname(os.path.abspath(__file__)), TABLES_FILE))
+
+def tables_ready():
+    """ Can the solver start without building its tables (already loaded, or a table file exists)? """
+    return _tables is not None or os.path.exists(tables_path())
+
+def get_tables(verify=True):
+    """ Returns the solver tables, memory-mapping the table file on first use, or building them in memory without one.
+    The file's checksum is checked when it is mapped, unless verify is false (for workers whose parent checked it).
+    Raises ValueError for a corrupted, stale or foreign table file """
+    global _tables
+    if _tables is None:
+        path = tables_path()
+        _tables = SolverTables.load(path, verify) if os.path.exists(path) else SolverTables.build()
+    return _tables
+
+def is_redundant(move, last_move):
+    """ Skips turning the same face twice in a row, and orders turns of opposite faces (D U, but not U D) """
+    if last_move is None:
+        return False
+    (face, last_face) = (move // 3, last_move // 3)
+    return face == last_face or face == last_face - 3
+
+class TwoPhaseSearch:
+    """ One search for solutions of cubie_cube, shortened until the deadline or max_length is met """
+    def __init__(self, cubie_cube, tables, max_length, deadline):
+        self.cubie_cube = cubie_cube
+        self.tables = tables
+        self.max_total = max_length if max_length is not None else MAX_LENGTH
+        self.stop_at_first = deadline is None or max_length is not None
+        self.deadline = deadline
+        self.moves = []
+        self.best = None
+        self.done = False
+
+    def run(self):
+        tables = self.tables
+        (twist, flip, slice_) = (self.cubie_cube.get_twist(), self.cubie_cube.get_flip(), self.cubie_cube.get_slice())
+        distance = max(tables.slice_twist_prune[slice_ * N_TWIST + twist], tables.slice_flip_prune[slice_ * N_FLIP + flip])
+        phase1_length = distance
+        while not self.done and phase1_length <= self.max_total:
+            self.phase1(twist, flip, slice_, phase1_length)
+            phase1_length += 1
+        return self.best
+
+    def out_of_time(self):
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            self.done = True
+        return self.done
+
+    def phase1(self, twist, flip, slice_, togo):
+        if togo == 0:
+            # A phase 1 ending in a phase 2 move was already tried as a shorter phase 1
+            if not self.moves or self.moves[-1] not in PHASE2_MOVES:
+                self.start_phase2()
+            return
+        if self.out_of_time():
+            return
+        tables = self.tables
+        last_move = self.moves[-1] if self.moves else None
+        for move in range(N_MOVES):
+            if is_redundant(move, last_move):
+                continue
+            new_twist = tables.twist_move[N_MOVES * twist + move]
+            new_flip = tables.flip_move[N_MOVES * flip + move]
+            new_slice = tables.slice_move[N_MOVES * slice_ + move]
+            if tables.slice_twist_prune[new_slice * N_TWIST + new_twist] >= togo or tables.slice_flip_prune[new_slice * N_FLIP + new_flip] >= togo:
+                continue
+            self.moves.append(move)
+            self.phase1(new_twist, new_flip, new_slice, togo - 1)
+            self.moves.pop()
+            if self.done:
+                return
+
+    def start_phase2(self):
+        tables = self.tables
+        cube = self.cubie_cube.copy()
+        for move in self.moves:
+            cube.multiply(MOVE_CUBES[move])
+        (corners, ud_edges, slice_sorted) = (cube.get_corners(), cube.get_ud_edges(), cube.get_slice_sorted())
+        distance = max(tables.corners_prune[slice_sorted * N_CORNERS + corners], tables.ud_edges_prune[slice_sorted * N_UD_EDGES + ud_edges])
+        for phase2_length in range(distance, min(MAX_PHASE2_LENGTH, self.max_total - len(self.moves)) + 1):
+            if self.out_of_time():
+                return
+            if self.phase2(corners, ud_edges, slice_sorted, phase2_length):
+                self.max_total = len(self.best) - 1
+                self.done = self.stop_at_first
+                return
+
+    def phase2(self, corners, ud_edges, slice_sorted, togo):
+        if togo == 0:
+            self.best = list(self.moves)
+            return True
+        if self.out_of_time():
+            return False
+        tables = self.tables
+        last_move = self.moves[-1] if self.moves else None
+        for move in PHASE2_MOVES:
+            if is_redundant(move, last_move):
+                continue
+            new_corners = tables.corners_move[N_MOVES * corners + move]
+            new_ud_edges = tables.ud_edges_move[N_MOVES * ud_edges + move]
+            new_slice_sorted = tables.slice_sorted_move[N_MOVES * slice_sorted + move]
+            if tables.corners_prune[new_slice_sorted * N_CORNERS + new_corners] >= togo or tables.ud_edges_prune[new_slice_sorted * N_UD_EDGES + new_ud_edges] >= togo:
+                continue
+            self.moves.append(move)
+            found = self.phase2(new_corners, new_ud_edges, new_slice_sorted, togo - 1)
+            self.moves.pop()
+            if found or self.done:
+                return found
+        return False
+
+def solve_stickers(stickers, max_length=None, timeout=None):
+    """ Solves a sticker array (see RubiksCube.stickers). See solve for the budget parameters """
+    cubie_cube = CubieCube.from_stickers(stickers)
+    cubie_cube.verify()
+    tables = get_tables() # The budget starts once the tables are available
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    search = TwoPhaseSearch(cubie_cube, tables, max_length, deadline)
+    moves = search.run()
+    if moves is None:
+        if search.done:
+            raise TimeoutError(f"No solution found within {timeout} seconds")
+        raise ValueError(f"No solution of {max_length} moves or fewer")
+    return " ".join(MOVE_NAMES[move] for move in moves)
+
+def solve(cube, max_length=None, timeout=None):
+    """ Returns a solution for cube as a string of face turns that rotate_from_input (and Algorithm) accept.
+    With only max_length, returns the first solution of at most max_length moves. With a timeout (in seconds),
+    keeps looking for shorter solutions and returns the best one found in time, or stops early once one of
+    max_length moves or fewer is found. Raises ValueError if the cube can not be solved """
+    return solve_stickers(cube.stickers, max_length, timeout)
@@ -0,0 +1,53 @@
+""" The 48 symmetries of the cube (24 rotations, each with or without a mirror) as sticker permutations,
+and symmetry-reduced canonical forms of cube states """
+
+from operator import itemgetter
+from enums import *
+from move_tables import FACE_STARTS, ROTATIONS, STICKER_FACES, STICKER_INDEX, STICKERS, compose
+
+CENTERS = tuple(start + 4 for start in FACE_STARTS) # Center sticker index of each face, in URFDLB order
+COLOR_CODES = {color: code for code, color in enumerate(Color)}
+
+def mirror_permutation():
+    """ Permutation reflecting the cube through the plane between L and R (x -> -x) """
+    perm = [0] * len(STICKERS)
+    for index, ((x, y, z), face) in enumerate(STICKERS):
+        mirrored_face = Face(-face.value) if face in (Face.L, Face.R) else face
+        perm[STICKER_INDEX[((-x, y, z), mirrored_face)]] = index
+    return tuple(perm)
+
+MIRROR = mirror_permutation()
+SYMMETRIES = ROTATIONS + [compose(rotation, MIRROR) for rotation in ROTATIONS] # Index 0 is the identity
+SYMMETRY_GATHERS = [itemgetter(*perm) for perm in SYMMETRIES]
+
+def conjugate(stickers, symmetry):
+    """ Returns the stickers of S^-1 X S for the state X and symmetry index S: the state is moved by the symmetry,
+    then recolored so every center keeps its color. Conjugating a solvable state gives a solvable state """
+    moved = SYMMETRY_GATHERS[symmetry](stickers)
+    recolor = {moved[center]: stickers[center] for center in CENTERS}
+    return [recolor[color] for color in moved]
+
+def canonical_form(stickers):
+    """ Returns (key, symmetry index) for the least of the 48 conjugates of a state. key is 54 bytes giving, per sticker,
+    the index (in URFDLB order) of the face whose center has its color. States related by a whole-cube rotation,
+    a symmetry conjugation or a change of color scheme share the same key """
+    codes = [COLOR_CODES[color] for color in stickers]
+    table = bytearray(256)
+    best = None
+    for symmetry, gather in enumerate(SYMMETRY_GATHERS):
+        moved = bytes(gather(codes))
+        for face, center in enumerate(CENTERS):
+            table[moved[center]] = face
+        key = moved.translate(table)
+        if best is None or key < best:
+            (best, best_symmetry) = (key, symmetry)
+    return (best, best_symmetry)
+
+def canonical_key(stickers):
+    """ Returns the 54-byte canonical key of a state (see canonical_form), suitable for caches and visited sets """
+    return canonical_form(stickers)[0]
+
+def key_stickers(key):
+    """ Returns the stickers of the representative state for a canonical key, in the standard color scheme """
+    colors = [Color(face.value) for face in STICKER_FACES]
+    return [colors[face] for face in key]
@@ -0,0 +1,106 @@
+""" Versioned, checksummed binary table files, memory-mapped so pages are only read when touched """
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+MAGIC = b"RUBIKTBL"
+FORMAT_VERSION = 2
+PREFIX = struct.Struct("<8sI") # magic, file format version: the start of the header in every format version
+# magic, file format version, content version, byte order of the arrays ("little" or "big"), number of tables,
+# CRC-32 of everything after the header
+HEADER = struct.Struct("<8sII8sII")
+ENTRY = struct.Struct("<32s4sQQ") # table name, array typecode, byte offset, byte length
+ALIGNMENT = 64
+
+def write_tables(path, tables, version):
+    """ Writes {name: array or bytearray} to path, in this machine's byte order. The file is written beside path
+    and then moved into place """
+    entries = []
+    offset = HEADER.size + ENTRY.size * len(tables)
+    for name, table in tables.items():
+        offset += -offset % ALIGNMENT
+        data = memoryview(table).cast('B')
+        entries.append((name, getattr(table, 'typecode', 'B'), offset, data))
+        offset += len(data)
+    body = bytearray()
+    for (name, typecode, offset, data) in entries:
+        body += ENTRY.pack(name.encode(), typecode.encode(), offset, len(data))
+    for (name, typecode, offset, data) in entries:
+        body += bytes(offset - HEADER.size - len(body))
+        body += data
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, version, sys.byteorder.encode(), len(tables), zlib.crc32(body)))
+        file.write(body)
+    os.replace(temporary_path, path)
+
+def read_header(mapped, version):
+    """ Checks the header and returns (number of tables, checksum). Raises ValueError for foreign, stale or
+    truncated files, and for files written on a machine of the other byte order """
+    if len(mapped) < PREFIX.size:
+        raise ValueError("Table file is truncated")
+    (magic, format_version) = PREFIX.unpack_from(mapped, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a table file")
+    if format_version != FORMAT_VERSION:
+        raise ValueError(f"Table file has format version {format_version}, expected {FORMAT_VERSION}. Rebuild it")
+    if len(mapped) < HEADER.size:
+        raise ValueError("Table file is truncated")
+    (_, _, content_version, byte_order, count, checksum) = HEADER.unpack_from(mapped, 0)
+    if content_version != version:
+        raise ValueError(f"Table file has version {content_version}, expected {version}. Rebuild it")
+    byte_order = byte_order.rstrip(b"\0").decode("ascii", "replace")
+    if byte_order != sys.byteorder:
+        raise ValueError(f"Table file was written in {byte_order}-endian byte order, this machine is {sys.byteorder}-endian. Rebuild it")
+    if len(mapped) < HEADER.size + ENTRY.size * count:
+        raise ValueError("Table file is truncated")
+    return (count, checksum)
+
+def open_tables(path, version, verify=False):
+    """ Memory-maps the tables in path and returns {name: memoryview}. Only the header is read up front,
+    unless verify is set, which also checks the checksum (and so reads the whole file) """
+    with open(path, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    (count, checksum) = read_header(mapped, version)
+    if verify and zlib.crc32(memoryview(mapped)[HEADER.size:]) != checksum:
+        raise ValueError("Table file checksum does not match, it may be corrupted. Rebuild it")
+    view = memoryview(mapped) # Keeps the mapping open for as long as any table is referenced
+    tables = {}
+    for i in range(count):
+        (name, typecode, offset, length) = ENTRY.unpack_from(mapped, HEADER.size + ENTRY.size * i)
+        if offset + length > len(mapped):
+            raise ValueError("Table file is truncated")
+        tables[name.rstrip(b"\0").decode()] = view[offset:offset + length].cast(typecode.rstrip(b"\0").decode())
+    return tables
+
+def main():
+    import solver
+    parser = argparse.ArgumentParser(description="Build or check the precomputed solver tables")
+    parser.add_argument("command", choices=["build", "verify", "info"])
+    parser.add_argument("--path", default=solver.tables_path(), help="table file (default: %(default)s)")
+    args = parser.parse_args()
+    try:
+        run_command(args.command, args.path)
+    except (OSError, ValueError) as error:
+        parser.exit(1, f"{error}\n")
+
+def run_command(command, path):
+    import solver
+    match command:
+        case "build":
+            print(f"Building solver tables into {path}...")
+            write_tables(path, solver.SolverTables.build().as_dict(), solver.TABLES_VERSION)
+            print(f"Done, {os.path.getsize(path)} bytes.")
+        case "verify":
+            open_tables(path, solver.TABLES_VERSION, verify=True)
+            print(f"{path} is valid.")
+        case "info":
+            for name, table in open_tables(path, solver.TABLES_VERSION).items():
+                print(f"{name}: {len(table)} entries of '{table.format}'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+""" The modules live at the top of the repository, next to this directory """
+
+import os
+import shutil
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TABLES_ENV = "RUBIKS_SOLVER_TABLES"
+
+@pytest.fixture(scope="session")
+def solver_tables(tmp_path_factory):
+    """ Solver tables in a table file of their own, found by solver (and by any worker process) through
+    RUBIKS_SOLVER_TABLES. A valid solver_tables.bin is copied; without one the tables are built, once per session """
+    import solver
+    from tables import open_tables, write_tables
+    path = str(tmp_path_factory.mktemp("solver") / solver.TABLES_FILE)
+    try:
+        open_tables(solver.tables_path(), solver.TABLES_VERSION, verify=True)
+        shutil.copyfile(solver.tables_path(), path)
+    except (OSError, ValueError):
+        write_tables(path, solver.SolverTables.build().as_dict(), solver.TABLES_VERSION)
+    previous = os.environ.get(TABLES_ENV)
+    os.environ[TABLES_ENV] = path
+    solver._tables = None
+    yield solver.get_tables()
+    solver._tables = None
+    if previous is None:
+        del os.environ[TABLES_ENV]
+    else:
+        os.environ[TABLES_ENV] = previous
@@ -0,0 +1,77 @@
+""" Tests for algorithm parsing, expansion and compilation """
+
+import random
+import pytest
+from algorithm import MAX_MOVES, MAX_NESTING, Algorithm, compile_algorithm, parse_moves
+from move_tables import MOVES
+from rubiks_cube import RubiksCube
+
+def test_deep_nesting_raises_value_error():
+    with pytest.raises(ValueError):
+        Algorithm("(" * 1200 + "R" + ")" * 1200)
+
+def test_nesting_up_to_limit_is_accepted():
+    text = "(" * MAX_NESTING + "R" + ")" * MAX_NESTING
+    assert parse_moves(text) == [("R", 1)]
+    assert Algorithm(text).move_names() == ["R"]
+    with pytest.raises(ValueError):
+        parse_moves("(" + text + ")")
+
+def names(text):
+    return Algorithm(text).move_names()
+
+def test_commutator_and_conjugate_expansion():
+    assert names("[R, U]") == "R U R' U'".split()
+    assert names("[R: U]") == "R U R'".split()
+    assert names("[R U: [F, D2]]") == "R U F D2 F' D2 U' R'".split()
+    assert names("[R, U]2") == "R U R' U' R U R' U'".split()
+    assert names("[R, U]'") == "U R U' R'".split()
+    assert names("(R U2)' R") == ["U2"]
+
+@pytest.mark.parametrize("text", ["[R U: [F, D2]]3", "((R U)2 [M', E])' x", "[[R, U], [F: L2]]"])
+def test_compiled_brackets_match_move_by_move(text):
+    (compiled, stepped) = (RubiksCube(), RubiksCube())
+    compiled.apply_algorithm(text)
+    for move_name in names(text):
+        stepped.apply_move(move_name)
+    assert compiled.stickers == stepped.stickers
+
+@pytest.mark.parametrize("text", ["(R U", "R U)", "[R, U, F]", "(R, U)", "R Q", "[R, U] ,"])
+def test_invalid_notation_raises_value_error(text):
+    with pytest.raises(ValueError):
+        Algorithm(text)
+
+def test_groups_repeats_and_cancellation():
+    assert names("(R U)3") == "R U R U R U".split()
+    assert names("R (U2 U2) R") == ["R2"]
+    assert names("R R R") == ["R'"]
+    assert names("R R'") == []
+    assert names("x y2 y2 x'") == []
+
+@pytest.mark.parametrize("seed", range(5))
+def test_compiled_algorithm_matches_move_by_move(seed):
+    rng = random.Random(seed)
+    move_names = [rng.choice(list(MOVES)) for _ in range(40)]
+    (compiled, stepped) = (RubiksCube(), RubiksCube())
+    algorithm = compiled.apply_algorithm(" ".join(move_names))
+    for move_name in move_names:
+        stepped.apply_move(move_name)
+    assert compiled.stickers == stepped.stickers
+    compiled.apply_algorithm(algorithm.inverse())
+    assert compiled.is_solved()
+
+def test_compiled_algorithms_are_cached():
+    assert compile_algorithm("R U R' U'") is compile_algorithm("R U R' U'")
+
+def test_huge_repeats_apply_but_do_not_expand():
+    algorithm = compile_algorithm("(R U)210000000")
+    cube = RubiksCube()
+    algorithm.apply(cube)
+    assert cube.is_solved() # R U has order 105, which divides 210000000
+    algorithm.inverse().apply(cube)
+    assert cube.is_solved()
+    with pytest.raises(ValueError):
+        len(algorithm)
+    with pytest.raises(ValueError):
+        str(algorithm)
+    assert str(MAX_MOVES) in repr(algorithm)
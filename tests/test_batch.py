@@ -0,0 +1,45 @@
+""" Tests for headless batch mode (batch.py and main.py --batch) """
+
+import io
+import json
+import os
+import subprocess
+import sys
+import batch
+from rubiks_cube import RubiksCube
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+def run_lines(lines):
+    output = io.StringIO()
+    batch.run(io.StringIO("\n".join(lines) + "\n"), output)
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+def test_records_in_order():
+    scrambled = RubiksCube()
+    scrambled.apply_algorithm("R U")
+    lines = [json.dumps({"id": 1, "moves": "R U"}), "",
+             json.dumps({"id": 2, "state": scrambled.to_bytes().hex(), "moves": "U' R'"}),
+             json.dumps({"moves": "x y z"})]
+    results = run_lines(lines)
+    assert [result.get("id") for result in results] == [1, 2, None]
+    assert results[0]["state"] == scrambled.to_bytes().hex() and results[0]["solved"] is False
+    assert results[1]["solved"] is True
+    assert results[2]["solved"] is True
+    assert all(result["seconds"] >= 0 for result in results)
+
+def test_bad_records_are_reported_in_place():
+    results = run_lines(["{not json", "[1, 2]", json.dumps({"id": "q", "moves": "R Q"}), json.dumps({"state": "zz"}), json.dumps({"moves": "R"})])
+    assert [("error" in result) for result in results] == [True, True, True, True, False]
+    assert results[2]["id"] == "q"
+
+def test_main_batch_mode():
+    completed = subprocess.run([sys.executable, MAIN, "--batch", "-"], input='{"moves": "R R R R"}\n', capture_output=True, text=True, timeout=60)
+    assert completed.returncode == 0
+    assert json.loads(completed.stdout)["solved"] is True
+
+def test_main_batch_missing_file(tmp_path):
+    completed = subprocess.run([sys.executable, MAIN, "--batch", str(tmp_path / "missing.jsonl")], capture_output=True, text=True, timeout=60)
+    assert completed.returncode == 1
+    assert "Can not read batch file" in completed.stderr
+    assert "Traceback" not in completed.stderr
@@ -0,0 +1,25 @@
+""" Tests for the process-pool batch solver """
+
+import pytest
+import batch_solver
+from rubiks_cube import RubiksCube
+from scramble import generate_scrambles
+
+def test_results_are_in_input_order(solver_tables):
+    scrambles = list(generate_scrambles(40, 20, seed=3))
+    scrambles[17] = "R Q" # An invalid scramble is reported in its place
+    results = list(batch_solver.solve_scrambles(iter(scrambles), workers=2))
+    assert [result["scramble"] for result in results] == scrambles
+    assert "error" in results[17]
+    for result in results[:17] + results[18:]:
+        cube = RubiksCube()
+        cube.apply_algorithm(result["scramble"])
+        cube.apply_algorithm(result["solution"])
+        assert cube.is_solved()
+
+def test_stale_table_file_is_reported(tmp_path, monkeypatch):
+    path = tmp_path / "stale.bin"
+    path.write_bytes(b"RUBIKTBL" + (1).to_bytes(4, "little") + bytes(64))
+    monkeypatch.setenv("RUBIKS_SOLVER_TABLES", str(path))
+    with pytest.raises(ValueError, match="Rebuild"):
+        batch_solver.ensure_table_file()
@@ -0,0 +1,22 @@
+""" Tests for the benchmark harness """
+
+import io
+import sys
+import time
+import benchmark
+
+def test_percentiles_are_per_call_latencies():
+    calls = iter(range(10 ** 9))
+    def operation(): # Every 50th call is slow: per-call p99 sees it, a 100-call mean would not
+        if next(calls) % 50 == 0:
+            time.sleep(0.002)
+    result = benchmark.measure(operation, 0.05)
+    assert result["p50_ns"] < 1_000_000 <= result["p99_ns"]
+    assert result["ops_per_sec"] > 0
+
+def test_gui_benchmark_is_skipped_without_tkinter(monkeypatch):
+    monkeypatch.setitem(sys.modules, "gui", None)
+    output = io.StringIO()
+    results = benchmark.run(["move_and_redraw", "is_solved"], duration=0.01, output=output)
+    assert list(results) == ["is_solved"]
+    assert "move_and_redraw     skipped" in output.getvalue()
@@ -0,0 +1,101 @@
+""" Tests for the state cache and cached cube queries """
+
+import pytest
+from cache import MISSING, StateCache, state_key
+from rubiks_cube import RubiksCube
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_least_recently_used_entry_is_evicted():
+    cache = StateCache(max_entries=2)
+    cache.put(b"a", 1)
+    cache.put(b"b", 2)
+    assert cache.get(b"a") == 1 # b is now the least recently used
+    cache.put(b"c", 3)
+    assert len(cache) == 2
+    assert cache.get(b"b") is MISSING
+    assert (cache.get(b"a"), cache.get(b"c")) == (1, 3)
+    assert cache.stats() == {"entries": 2, "hits": 3, "disk_hits": 0, "misses": 1, "evictions": 1, "hit_rate": 0.75}
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = StateCache(ttl=10, clock=clock)
+    cache.put(b"a", 1)
+    clock.now += 9.5
+    assert cache.get(b"a") == 1
+    clock.now += 0.5
+    assert cache.get(b"a") is MISSING
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_get_or_compute_computes_once():
+    cache = StateCache()
+    calls = []
+    def compute():
+        calls.append(1)
+        return "R U"
+    assert cache.get_or_compute(b"a", compute) == cache.get_or_compute(b"a", compute) == "R U"
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_disk_tier_outlives_the_cache(tmp_path):
+    path = str(tmp_path / "cache")
+    cache = StateCache(path=path)
+    cache.put(b"a", "R U")
+    cache.close()
+    cache = StateCache(path=path)
+    assert cache.get(b"a") == "R U" # From disk, then from memory
+    assert cache.get(b"a") == "R U"
+    assert cache.get(b"b") is MISSING
+    assert (cache.hits, cache.disk_hits, cache.misses) == (1, 1, 1)
+    cache.clear()
+    cache.close()
+    cache = StateCache(path=path)
+    assert cache.get(b"a") is MISSING
+    cache.close()
+
+def test_disk_entries_expire(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / "cache")
+    cache = StateCache(ttl=10, path=path, clock=clock)
+    cache.put(b"a", "R U")
+    cache.close()
+    clock.now += 10
+    cache = StateCache(ttl=10, path=path, clock=clock)
+    assert cache.get(b"a") is MISSING
+    cache.close()
+
+def test_state_key_tells_states_apart():
+    cube = RubiksCube()
+    key = state_key(cube.stickers)
+    assert len(key) == 54
+    cube.apply_move("R")
+    assert state_key(cube.stickers) != key
+
+def test_solution_is_cached_per_state(solver_tables):
+    cube = RubiksCube()
+    cube.query_cache = StateCache()
+    cube.randomize(30, 0)
+    solution = cube.solution()
+    assert cube.solution() == solution
+    assert (cube.query_cache.hits, cube.query_cache.misses) == (1, 1)
+    cube.apply_move("R")
+    changed = RubiksCube.from_bytes(cube.to_bytes())
+    other = cube.solution()
+    assert cube.query_cache.misses == 2
+    assert other != solution
+    changed.apply_algorithm(other)
+    assert changed.is_solved()
+
+def test_arguments_are_part_of_the_key(solver_tables):
+    cube = RubiksCube()
+    cube.query_cache = StateCache()
+    cube.randomize(30, 1)
+    cube.solution()
+    cube.solution(max_length=30)
+    assert cube.query_cache.misses == 2
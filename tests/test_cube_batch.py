@@ -0,0 +1,89 @@
+""" Tests for the NumPy cube batch, against RubiksCube move by move """
+
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+from cube_batch import COLOR_CODES, MOVE_CODES, MOVE_NAMES, CubeBatch
+from enums import *
+from rubiks_cube import RubiksCube
+
+def random_moves(rng, count):
+    return [rng.choice(MOVE_NAMES) for _ in range(count)]
+
+def scrambled_cubes(rng, count):
+    cubes = [RubiksCube() for _ in range(count)]
+    for cube in cubes:
+        for move_name in random_moves(rng, 15):
+            cube.apply_move(move_name)
+    return cubes
+
+def assert_matches(batch, cubes):
+    assert [cube.stickers for cube in batch.to_cubes()] == [cube.stickers for cube in cubes]
+
+def test_from_cubes_to_cube_round_trip():
+    cubes = scrambled_cubes(random.Random(1), 8)
+    batch = CubeBatch.from_cubes(cubes)
+    assert batch.states.shape == (8, 54)
+    assert_matches(batch, cubes)
+    assert batch.to_cube(3).stickers == cubes[3].stickers
+
+@pytest.mark.parametrize("seed", range(3))
+def test_apply_matches_cubes(seed):
+    rng = random.Random(seed)
+    cubes = scrambled_cubes(rng, 5)
+    batch = CubeBatch.from_cubes(cubes)
+    for move_name in random_moves(rng, 40):
+        batch.apply(move_name)
+        for cube in cubes:
+            cube.apply_move(move_name)
+    assert_matches(batch, cubes)
+
+@pytest.mark.parametrize("seed", range(3))
+def test_apply_moves_matches_cubes(seed):
+    rng = random.Random(seed)
+    cubes = scrambled_cubes(rng, 5)
+    batch = CubeBatch.from_cubes(cubes)
+    move_names = random_moves(rng, 40)
+    batch.apply_moves(move_names)
+    for cube in cubes:
+        for move_name in move_names:
+            cube.apply_move(move_name)
+    assert_matches(batch, cubes)
+
+@pytest.mark.parametrize("seed", range(3))
+def test_apply_per_row_matches_cubes(seed):
+    rng = random.Random(seed)
+    cubes = scrambled_cubes(rng, 12)
+    batch = CubeBatch.from_cubes(cubes)
+    for step in range(20):
+        move_names = random_moves(rng, len(cubes))
+        if step % 2:
+            batch.apply_per_row(move_names)
+        else:
+            batch.apply_per_row(np.array([MOVE_CODES[name] for name in move_names]))
+        for cube, move_name in zip(cubes, move_names):
+            cube.apply_move(move_name)
+    assert_matches(batch, cubes)
+
+def test_apply_per_row_needs_one_move_per_cube():
+    with pytest.raises(ValueError):
+        CubeBatch.solved(3).apply_per_row(["R", "U"])
+
+def test_is_solved():
+    batch = CubeBatch.solved(4)
+    batch.apply_per_row(["R", "x", "U2", "M"])
+    assert batch.is_solved().tolist() == [False, True, False, False]
+    cubes = scrambled_cubes(random.Random(5), 6) + [RubiksCube()]
+    assert CubeBatch.from_cubes(cubes).is_solved().tolist() == [cube.is_solved() for cube in cubes]
+
+def test_face_color_counts():
+    cubes = scrambled_cubes(random.Random(2), 4)
+    counts = CubeBatch.from_cubes(cubes).face_color_counts()
+    assert counts.shape == (4, 6, 6)
+    for n, cube in enumerate(cubes):
+        for face in range(6):
+            stickers = cube.stickers[9 * face:9 * face + 9]
+            for color, code in COLOR_CODES.items():
+                assert counts[n, face, code] == stickers.count(color)
+    assert (CubeBatch.solved(2).face_color_counts().sum(axis=2) == 9).all()
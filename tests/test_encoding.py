@@ -0,0 +1,42 @@
+""" Tests for the compact state encoding (to_bytes/from_bytes) and cube equality and hashing """
+
+import pytest
+from cubie import STATE_BYTES
+from rubiks_cube import RubiksCube
+
+def scrambled(seed):
+    cube = RubiksCube()
+    cube.randomize(30, seed)
+    return cube
+
+@pytest.mark.parametrize("seed", range(5))
+def test_bytes_round_trip(seed):
+    cube = scrambled(seed)
+    data = cube.to_bytes()
+    assert len(data) == STATE_BYTES
+    assert RubiksCube.from_bytes(data).stickers == cube.stickers
+
+def test_bytes_keep_whole_cube_orientation():
+    cube = RubiksCube()
+    cube.apply_move("x")
+    cube.apply_move("y'")
+    restored = RubiksCube.from_bytes(cube.to_bytes())
+    assert restored.stickers == cube.stickers
+    assert restored.is_solved()
+
+def test_solved_cube_round_trip_with_tracking():
+    cube = RubiksCube.from_bytes(RubiksCube().to_bytes(), track_solved=True)
+    assert cube.is_solved()
+    cube.apply_move("R")
+    assert not cube.is_solved()
+
+def test_equal_states_are_equal_and_hash_alike():
+    (first, second) = (scrambled(1), scrambled(1))
+    assert first == second and hash(first) == hash(second)
+    assert len({first, second, scrambled(2)}) == 2
+    second.apply_move("U")
+    assert first != second
+
+def test_invalid_bytes():
+    with pytest.raises(ValueError):
+        RubiksCube.from_bytes(b"\xff" * STATE_BYTES)
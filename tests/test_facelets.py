@@ -0,0 +1,69 @@
+""" Tests for facelet strings and facelet files """
+
+import io
+import pytest
+from facelets import convert, from_facelets, read_facelets, to_facelets, write_facelets
+from rubiks_cube import RubiksCube
+
+SOLVED = "UUUUUUUUURRRRRRRRRFFFFFFFFFDDDDDDDDDLLLLLLLLLBBBBBBBBB"
+
+def scrambled(seed):
+    cube = RubiksCube()
+    cube.randomize(30, seed)
+    return cube
+
+def test_solved_cube_string():
+    assert RubiksCube().to_facelets() == SOLVED
+    assert from_facelets(SOLVED) == RubiksCube().stickers
+
+@pytest.mark.parametrize("seed", range(3))
+def test_facelets_round_trip(seed):
+    cube = scrambled(seed)
+    text = cube.to_facelets()
+    assert to_facelets(from_facelets(text)) == text
+    assert RubiksCube.from_facelets(text) == cube
+
+@pytest.mark.parametrize("text", [SOLVED[:-1], SOLVED + "U", SOLVED[:-1] + "X"])
+def test_malformed_strings(text):
+    with pytest.raises(ValueError):
+        from_facelets(text)
+
+def test_read_facelets_skips_blank_lines_and_yields_cubes():
+    cubes = [scrambled(seed) for seed in range(3)]
+    output = io.StringIO()
+    write_facelets(output, cubes)
+    text = "\n" + output.getvalue().replace("\n", "\n\n", 1)
+    assert list(read_facelets(io.StringIO(text))) == [cube.stickers for cube in cubes]
+    read = list(read_facelets(io.StringIO(text), cubes=True))
+    assert all(isinstance(cube, RubiksCube) for cube in read)
+    assert read == cubes
+
+def test_read_facelets_names_the_bad_line():
+    lines = io.StringIO(f"{SOLVED}\n\n{SOLVED[:-1]}X\n")
+    states = read_facelets(lines, cubes=True)
+    assert next(states).is_solved()
+    with pytest.raises(ValueError, match="Line 3: 'X' is not a face letter"):
+        next(states)
+
+def test_convert_to_bytes_and_back():
+    cubes = [scrambled(seed) for seed in range(3)]
+    text = "".join(cube.to_facelets() + "\n" for cube in cubes)
+    encoded = io.StringIO()
+    convert("to-bytes", io.StringIO(text), encoded)
+    assert encoded.getvalue().splitlines() == [cube.to_bytes().hex() for cube in cubes]
+    decoded = io.StringIO()
+    convert("from-bytes", io.StringIO(encoded.getvalue()), decoded)
+    assert decoded.getvalue() == text
+
+def test_convert_check():
+    twisted = RubiksCube()
+    twisted.stickers[0], twisted.stickers[9] = twisted.stickers[9], twisted.stickers[0] # Swap a U and an R sticker
+    output = io.StringIO()
+    convert("check", io.StringIO(f"{SOLVED}\n{twisted.to_facelets()}\n"), output)
+    (first, second) = output.getvalue().splitlines()
+    assert first == "ok"
+    assert second != "ok"
+
+def test_unknown_conversion():
+    with pytest.raises(ValueError):
+        convert("to-json", io.StringIO(SOLVED), io.StringIO())
@@ -0,0 +1,42 @@
+""" Tests for the undo/redo history """
+
+from history import History
+from rubiks_cube import RubiksCube
+
+def test_undo_redo_and_jump():
+    cube = RubiksCube()
+    history = History(cube, checkpoint_interval=4)
+    states = [list(cube.stickers)]
+    for move_name in "R U F' D2 L B' x M".split():
+        cube.apply_move(move_name)
+        history.record(move_name)
+        states.append(list(cube.stickers))
+    assert history.undo() == "M"
+    assert cube.stickers == states[-2]
+    assert history.redo() == "M"
+    for position in (0, 5, 2, 8, 3):
+        history.jump(position)
+        assert cube.stickers == states[position]
+
+def test_algorithm_is_one_entry():
+    cube = RubiksCube()
+    history = History(cube)
+    text = "(R U)200000000"
+    history.record_algorithm(cube.apply_algorithm(text), text)
+    assert len(history) == 1
+    after = list(cube.stickers)
+    assert history.undo() == text
+    assert cube.is_solved()
+    assert history.redo() == text
+    assert cube.stickers == after
+
+def test_recording_drops_redo_entries():
+    cube = RubiksCube()
+    history = History(cube)
+    history.record_algorithm(cube.apply_algorithm("[R, U]"), "[R, U]")
+    history.undo()
+    cube.apply_move("F")
+    history.record("F")
+    assert len(history) == 1 and not history.algorithms
+    history.jump(0)
+    assert cube.is_solved()
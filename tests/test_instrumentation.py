@@ -0,0 +1,58 @@
+""" Tests for opt-in instrumentation """
+
+import pytest
+import algorithm
+import instrumentation
+from rubiks_cube import RubiksCube
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    yield
+    instrumentation.disable()
+    instrumentation.stats.clear()
+
+def test_enable_and_disable_restore_the_originals():
+    originals = (RubiksCube.apply_move, RubiksCube.rotate, algorithm.parse_algorithm)
+    instrumentation.enable(dump_at_exit=False)
+    assert instrumentation.enabled()
+    assert RubiksCube.apply_move is not originals[0]
+    instrumentation.disable()
+    assert not instrumentation.enabled()
+    assert (RubiksCube.apply_move, RubiksCube.rotate, algorithm.parse_algorithm) == originals
+
+def test_enabling_twice_wraps_once():
+    instrumentation.enable(dump_at_exit=False)
+    wrapped = RubiksCube.apply_move
+    instrumentation.enable(dump_at_exit=False)
+    assert RubiksCube.apply_move is wrapped
+    RubiksCube().apply_move("R")
+    assert instrumentation.stats["RubiksCube.apply_move"].count == 1
+    instrumentation.disable()
+    assert not hasattr(RubiksCube.apply_move, "__wrapped__")
+
+def test_moves_are_counted_per_move_name():
+    instrumentation.enable(dump_at_exit=False)
+    cube = RubiksCube()
+    for move_name in ("R", "U", "R", "x'"):
+        cube.apply_move(move_name)
+    cube.apply_algorithm("(R U)2")
+    stats = instrumentation.stats
+    assert stats["RubiksCube.apply_move"].count == 4
+    assert stats["RubiksCube.apply_move:R"].count == 2
+    assert stats["RubiksCube.apply_move:x'"].count == 1
+    assert stats["RubiksCube.apply_gather"].count == 1
+    assert stats["RubiksCube.apply_algorithm"].count == 1
+    summary = instrumentation.summary()
+    assert "RubiksCube.apply_move:R " in summary
+    row = next(line for line in summary.splitlines() if line.startswith("RubiksCube.apply_move "))
+    assert row.split()[1] == "4"
+
+def test_disabled_instrumentation_records_nothing():
+    RubiksCube().apply_move("R")
+    assert instrumentation.summary() == "No stats recorded."
+
+def test_reset_clears_counts():
+    instrumentation.enable(dump_at_exit=False)
+    RubiksCube().apply_move("R")
+    instrumentation.reset()
+    assert instrumentation.stats["RubiksCube.apply_move"].count == 0
@@ -0,0 +1,75 @@
+""" Tests for the sticker permutation move engine """
+
+import pytest
+from enums import *
+from rubiks_cube import RubiksCube
+
+# Move sequences and the facelet string the original block rotation model (before moves were compiled into
+# sticker permutations) gave for them: one letter per sticker, naming the face whose color it has
+BLOCK_MODEL_STATES = [
+    ("R",
+     "UUFUUFUUFRRRRRRRRRFFDFFDFFDDDBDDBDDBLLLLLLLLLUBBUBBUBB"),
+    ("U'",
+     "UUUUUUUUUFFFRRRRRRLLLFFFFFFDDDDDDDDDBBBLLLLLLRRRBBBBBB"),
+    ("F2",
+     "UUUUUUDDDLRRLRRLRRFFFFFFFFFUUUDDDDDDLLRLLRLLRBBBBBBBBB"),
+    ("x",
+     "FFFFFFFFFRRRRRRRRRDDDDDDDDDBBBBBBBBBLLLLLLLLLUUUUUUUUU"),
+    ("y'",
+     "UUUUUUUUUFFFFFFFFFLLLLLLLLLDDDDDDDDDBBBBBBBBBRRRRRRRRR"),
+    ("z2",
+     "DDDDDDDDDLLLLLLLLLFFFFFFFFFUUUUUUUUURRRRRRRRRBBBBBBBBB"),
+    ("M",
+     "UBUUBUUBURRRRRRRRRFUFFUFFUFDFDDFDDFDLLLLLLLLLBDBBDBBDB"),
+    ("E'",
+     "UUUUUUUUURRRBBBRRRFFFRRRFFFDDDDDDDDDLLLFFFLLLBBBLLLBBB"),
+    ("S2",
+     "UUUDDDUUURLRRLRRLRFFFFFFFFFDDDUUUDDDLRLLRLLRLBBBBBBBBB"),
+    ("r",
+     "UFFUFFUFFRRRRRRRRRFDDFDDFDDDBBDBBDBBLLLLLLLLLUUBUUBUUB"),
+    ("u'",
+     "UUUUUUUUUFFFFFFRRRLLLLLLFFFDDDDDDDDDBBBBBBLLLRRRRRRBBB"),
+    ("f2",
+     "UUUDDDDDDLLRLLRLLRFFFFFFFFFUUUUUUDDDLRRLRRLRRBBBBBBBBB"),
+    ("R U R' U'",
+     "UULUUFUUFRRUBRRURRFFDFFUFFFDDRDDDDDDBLLLLLLLLBRRBBBBBB"),
+    ("L D' B2 l' d b'",
+     "DDLFULRRURUUDFFUUFDDFLLFDRRLBBUDRRFUBLFDBBDBFBLLURBLRB"),
+    ("M E S M' E' S'",
+     "UUUUDUUUURRRRRRRRRFFFFBFFFFDDDDUDDDDLLLLLLLLLBBBBFBBBB"),
+    ("x y z F R U",
+     "BDDBDDRRRBLLFFFFFFDDDRRURRUFFLUULUULRRFBBUBBUBBUDLLDLL"),
+    ("R2 U2 F2 B2 L2 D2 M2 E2 S2 x2 y2 z2",
+     "UUDDUUUUDLRLRRRRLRFBFBFBBBBDDUUDDDDULRLLLLRLRBFBFBFFFF"),
+    ("y' d S' M' U R2 S2 x F U B' F L' L M' M x F R x' E L D b' U",
+     "ULDUFBRDLUURBRUFLBULFDDDDFRBUURBFDDRLRBRLRFFLFBBLUBDFL"),
+    ("U R B B' S2 F' M' E' d z x x' u' R R R L' l R z x' L D2 M D",
+     "RFRDUBRLUFUFLFULDUUFLDLBUBBLRDRDRLBFBLBLBFDFBDUDRRURDF"),
+    ("F' R U2 E' U B' z F l E' f2 E' D2 E' U B' z r y2 R D E y2 l y2",
+     "LRDURFRRRULFBFUFUUBDBDUDLURBLURLBDLLDRDBBFRFULBBFDLFDF"),
+    ("L' x z2 L' F' S' r x F' u' x' F' B U2 y2 z D U2 E y2 D2 M r r d",
+     "UDDUFBRUDLLBFDFFULDLFBLLRRRUUUDBBUDBLFFDURLBBRRBRRLDFF"),
+]
+
+def facelet_string(cube):
+    return "".join(Face(color.value).name for color in cube.stickers)
+
+@pytest.mark.parametrize(("moves", "expected"), BLOCK_MODEL_STATES)
+def test_moves_match_block_model(moves, expected):
+    cube = RubiksCube()
+    for move_name in moves.split():
+        assert cube.rotate_from_input(move_name)
+    assert facelet_string(cube) == expected
+
+def test_reverse_input_undoes_move():
+    cube = RubiksCube()
+    for move_name in ("R", "U'", "F2", "M", "x'", "r"):
+        cube.rotate_from_input(move_name)
+        cube.rotate_from_input(move_name, reverse=True)
+        assert cube.is_solved()
+
+def test_blocks_are_views_of_the_stickers():
+    cube = RubiksCube()
+    cube.rotate_from_input("R")
+    assert cube.get_block(1, 1, -1).get_color(Face.U) == Color(Face.F.value)
+    assert cube.get_block(1, 1, -1).get_color(Face.R) == Color(Face.R.value)
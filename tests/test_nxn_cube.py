@@ -0,0 +1,56 @@
+""" Tests for NxN cubes, checked against the 3x3 move engine where the two overlap """
+
+import pytest
+from move_tables import MOVES
+from nxn_cube import MIN_SIZE, NxNAlgorithm, NxNCube, valid_move_names
+from rubiks_cube import RubiksCube
+
+@pytest.mark.parametrize("move_name", sorted(MOVES))
+def test_move_matches_geometric_model(move_name):
+    (cube, reference) = (RubiksCube(), NxNCube(3))
+    cube.apply_algorithm("R U2 F' L D B2") # Start from a state without symmetries
+    reference.apply_algorithm("R U2 F' L D B2")
+    cube.apply_move(move_name)
+    reference.apply_move(move_name)
+    assert cube.stickers == reference.stickers
+
+@pytest.mark.parametrize("size", range(MIN_SIZE, 8))
+def test_scramble_and_inverse_solve(size):
+    cube = NxNCube(size)
+    scramble = NxNAlgorithm(cube.randomize(40, seed=size), size)
+    assert not cube.is_solved()
+    cube.apply_algorithm(scramble.inverse())
+    assert cube.is_solved()
+
+@pytest.mark.parametrize("size", [4, 5])
+def test_move_orders(size):
+    cube = NxNCube(size)
+    for (text, order) in (("2R", 4), ("3Rw'", 4), ("R U", 105)):
+        cube.apply_algorithm(f"({text}){order - 1}")
+        assert not cube.is_solved()
+        cube.apply_algorithm(text)
+        assert cube.is_solved()
+
+def test_inner_layer_turns_compose_wide_turns():
+    (wide, layers) = (NxNCube(5), NxNCube(5))
+    wide.apply_move("3Rw")
+    layers.apply_algorithm("R 2R 3R")
+    assert wide == layers
+
+def test_facelets_round_trip():
+    cube = NxNCube(4)
+    cube.apply_algorithm("Rw U2 2F' x")
+    assert NxNCube.from_facelets(cube.to_facelets()) == cube
+
+@pytest.mark.parametrize("size, move_name", [(2, "M"), (2, "3R"), (3, "4R"), (4, "5Rw"), (4, "Q")])
+def test_invalid_moves(size, move_name):
+    cube = NxNCube(size)
+    assert move_name not in valid_move_names(size)
+    with pytest.raises(ValueError):
+        cube.apply_move(move_name)
+    assert not cube.rotate_from_input(move_name)
+    assert cube.is_solved()
+
+def test_too_small_size():
+    with pytest.raises(ValueError):
+        NxNCube(MIN_SIZE - 1)
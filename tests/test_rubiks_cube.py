@@ -0,0 +1,36 @@
+""" Tests for RubiksCube state handling """
+
+from rubiks_cube import RubiksCube
+
+def test_lazy_matches_eager():
+    (eager, lazy) = (RubiksCube(), RubiksCube(lazy=True))
+    for cube in (eager, lazy):
+        cube.apply_algorithm("R U R' U' [F: M2]")
+        cube.apply_move("x")
+    assert lazy.stickers == eager.stickers
+    assert lazy.get_block(1, 1, 1).colors == eager.get_block(1, 1, 1).colors
+
+def test_switching_lazy_off_applies_pending_moves():
+    (eager, cube) = (RubiksCube(), RubiksCube(lazy=True))
+    cube.apply_move("R")
+    cube.lazy = False
+    cube.apply_move("U")
+    eager.apply_move("R")
+    eager.apply_move("U")
+    assert cube.stickers == eager.stickers
+
+def test_track_solved_agrees_with_full_check():
+    (tracked, untracked) = (RubiksCube(track_solved=True), RubiksCube())
+    for move_name in "R U M x' E2 S y y' S' E2 x M' U' R'".split():
+        tracked.apply_move(move_name)
+        untracked.apply_move(move_name)
+        assert tracked.is_solved() == untracked.is_solved()
+    assert tracked.is_solved()
+
+def test_is_solved_ignores_orientation_and_does_not_change_it():
+    cube = RubiksCube()
+    cube.apply_move("x")
+    cube.apply_move("y'")
+    stickers = list(cube.stickers)
+    assert cube.is_solved()
+    assert cube.stickers == stickers
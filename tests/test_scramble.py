@@ -0,0 +1,42 @@
+""" Tests for the seeded scramble generator """
+
+import io
+import random
+import pytest
+from rubiks_cube import RubiksCube
+from scramble import generate_scrambles, write_scrambles
+
+def test_seeded_scrambles_are_reproducible():
+    assert list(generate_scrambles(20, seed=42)) == list(generate_scrambles(20, seed=42))
+    assert list(generate_scrambles(20, seed=42)) != list(generate_scrambles(20, seed=43))
+
+def test_global_random_state_is_left_alone():
+    random.seed(1)
+    state = random.getstate()
+    list(generate_scrambles(50, seed=7))
+    assert random.getstate() == state
+    RubiksCube().randomize(25, seed=7)
+    assert random.getstate() == state
+
+@pytest.mark.parametrize("move_set", ["faces", "all"])
+def test_scrambles_are_valid_and_never_repeat_a_layer(move_set):
+    for scramble in generate_scrambles(30, 25, seed=1, move_set=move_set):
+        moves = scramble.split()
+        assert len(moves) == 25
+        layers = [move.rstrip("'2") for move in moves]
+        assert all(first != second for first, second in zip(layers, layers[1:]))
+        RubiksCube().apply_algorithm(scramble) # Raises ValueError for invalid moves
+
+def test_unknown_move_set():
+    with pytest.raises(ValueError):
+        next(generate_scrambles(1, move_set="wide"))
+
+def test_written_scrambles_match_generated():
+    file = io.StringIO()
+    write_scrambles(file, 5000, 10, seed=3)
+    assert file.getvalue().splitlines() == list(generate_scrambles(5000, 10, seed=3))
+
+def test_seeded_randomize_is_reproducible():
+    (first, second) = (RubiksCube(), RubiksCube())
+    assert first.randomize(25, seed=9) == second.randomize(25, seed=9)
+    assert first == second
@@ -0,0 +1,76 @@
+""" Tests for the HTTP service's request handling, without opening a socket """
+
+import asyncio
+import pytest
+from service import MAX_SOLVE_TIMEOUT, CubeService, HttpError, apply_record, solve_limits
+
+def failing_record(cube, record):
+    raise RuntimeError("boom")
+
+def test_failing_job_does_not_stop_the_queue():
+    async def run():
+        service = CubeService(solve=False)
+        try:
+            with pytest.raises(HttpError) as error:
+                await service.run_records(failing_record, [{}])
+            assert error.value.status == 500
+            [result] = await service.run_records(apply_record, [{"moves": "R U"}])
+            assert result["solved"] is False
+        finally:
+            service.close()
+    asyncio.run(asyncio.wait_for(run(), 5))
+
+def test_deeply_nested_moves_are_an_error_record():
+    async def run():
+        service = CubeService(solve=False)
+        try:
+            [result] = await service.run_records(apply_record, [{"moves": "(" * 1200 + "R" + ")" * 1200}])
+            assert "error" in result
+        finally:
+            service.close()
+    asyncio.run(asyncio.wait_for(run(), 5))
+
+def test_solve_limits():
+    assert solve_limits({}) == (None, MAX_SOLVE_TIMEOUT)
+    assert solve_limits({"max_length": 18, "timeout": 60}) == (18, MAX_SOLVE_TIMEOUT)
+    assert solve_limits({"timeout": 0.5}) == (None, 0.5)
+
+@pytest.mark.parametrize("record", [{"max_length": 18.5}, {"max_length": True}, {"max_length": 0}, {"max_length": "18"},
+                                    {"timeout": "1"}, {"timeout": True}, {"timeout": 0}, {"timeout": -1}, {"timeout": float("nan")}])
+def test_invalid_solve_limits(record):
+    with pytest.raises(HttpError) as error:
+        solve_limits(record)
+    assert error.value.status == 400
+
+def request(service, raw):
+    """ Sends one raw HTTP request to service over a local socket and returns the status line """
+    async def run():
+        server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+        async with server:
+            (reader, writer) = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            writer.write(raw)
+            status_line = await reader.readline()
+            writer.close()
+            return status_line.decode()
+    return asyncio.run(asyncio.wait_for(run(), 5))
+
+def test_unexpected_error_is_a_500_response():
+    service = CubeService(solve=False)
+    async def failing_route(method, path, body):
+        raise TypeError("boom")
+    service.route = failing_route
+    try:
+        assert request(service, b"GET /metrics HTTP/1.1\r\nConnection: close\r\n\r\n").startswith("HTTP/1.1 500")
+    finally:
+        service.close()
+
+def test_bad_limit_is_a_400_response():
+    service = CubeService(solve=False)
+    service.executor = object() # Never used: the limits are checked before any solve is submitted
+    body = b'{"scramble": "R U", "max_length": 18.5}'
+    try:
+        status_line = request(service, b"POST /solve HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+        assert status_line.startswith("HTTP/1.1 400")
+    finally:
+        service.executor = None
+        service.close()
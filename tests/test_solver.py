@@ -0,0 +1,46 @@
+""" Tests for the two-phase solver """
+
+import time
+import pytest
+import solver
+from rubiks_cube import RubiksCube
+
+@pytest.fixture(scope="module", autouse=True)
+def tables(solver_tables):
+    return solver_tables # Loaded (or built) once, outside the timed searches
+
+def scrambled(seed):
+    cube = RubiksCube()
+    cube.randomize(30, seed)
+    return cube
+
+@pytest.mark.parametrize("seed", range(5))
+def test_solution_solves_the_scramble(seed):
+    cube = scrambled(seed)
+    solution = solver.solve(cube)
+    cube.apply_algorithm(solution)
+    assert cube.is_solved()
+
+def test_max_length_is_respected():
+    cube = scrambled(0)
+    solution = solver.solve(cube, max_length=22)
+    assert len(solution.split()) <= 22
+    cube.apply_algorithm(solution)
+    assert cube.is_solved()
+
+@pytest.mark.parametrize("timeout", [0.05, 0.2])
+def test_timeout_is_respected(timeout):
+    for seed in range(10):
+        cube = scrambled(seed)
+        start = time.perf_counter()
+        try:
+            solution = solver.solve(cube, timeout=timeout)
+        except TimeoutError:
+            solution = None
+        assert time.perf_counter() - start < timeout + 0.1 # Margin for a loaded machine; the search itself stops at the deadline
+        if solution is not None:
+            cube.apply_algorithm(solution)
+            assert cube.is_solved()
+
+def test_solved_cube():
+    assert solver.solve(RubiksCube()) == ""
@@ -0,0 +1,53 @@
+""" Tests for cube symmetries and canonical keys """
+
+import pytest
+from rubiks_cube import RubiksCube
+from symmetry import SYMMETRIES, canonical_form, conjugate, key_stickers
+from validation import check_stickers
+
+def scrambled(seed):
+    cube = RubiksCube()
+    cube.randomize(30, seed)
+    return cube
+
+def test_symmetries_are_distinct():
+    assert len(SYMMETRIES) == len(set(SYMMETRIES)) == 48
+
+@pytest.mark.parametrize("seed", range(3))
+def test_key_is_invariant_under_rotations(seed):
+    cube = scrambled(seed)
+    key = cube.canonical_key()
+    for rotations in ("x", "y2", "z'", "x y", "z2 x'"):
+        rotated = RubiksCube.from_bytes(cube.to_bytes())
+        rotated.apply_algorithm(rotations)
+        assert rotated.stickers != cube.stickers
+        assert rotated.canonical_key() == key
+
+@pytest.mark.parametrize("seed", range(3))
+def test_key_is_invariant_under_conjugation(seed):
+    stickers = scrambled(seed).stickers
+    key = canonical_form(stickers)[0]
+    for symmetry in range(len(SYMMETRIES)):
+        conjugated = conjugate(stickers, symmetry)
+        assert check_stickers(conjugated) is None
+        assert canonical_form(conjugated)[0] == key
+
+def test_different_classes_have_different_keys():
+    cube = RubiksCube()
+    cube.apply_move("R")
+    other = RubiksCube()
+    other.apply_move("R2")
+    assert cube.canonical_key() != other.canonical_key() != RubiksCube().canonical_key()
+
+@pytest.mark.parametrize("seed", range(3))
+def test_canonical_is_a_valid_equivalent_state(seed):
+    cube = scrambled(seed)
+    (key, symmetry) = canonical_form(cube.stickers)
+    canonical = cube.canonical()
+    assert check_stickers(canonical.stickers) is None
+    assert canonical.stickers == key_stickers(key) == conjugate(cube.stickers, symmetry)
+    assert canonical.canonical_key() == key
+    assert canonical.canonical().stickers == canonical.stickers
+
+def test_canonical_of_solved_is_solved():
+    assert RubiksCube().canonical().is_solved()
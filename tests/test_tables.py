@@ -0,0 +1,70 @@
+""" Tests for the versioned table file format """
+
+import os
+import sys
+from array import array
+import pytest
+from tables import HEADER, open_tables, write_tables
+
+VERSION = 7
+
+@pytest.fixture
+def table_file(tmp_path):
+    path = str(tmp_path / "tables.bin")
+    tables = {"moves": array("H", range(1000)), "distances": bytearray(range(200)), "wide": array("I", [1, 2 ** 31, 7])}
+    write_tables(path, tables, VERSION)
+    return (path, tables)
+
+def rewrite(path, offset, data):
+    with open(path, "r+b") as file:
+        file.seek(offset)
+        file.write(data)
+
+def test_round_trip(table_file):
+    (path, tables) = table_file
+    for verify in (False, True):
+        opened = open_tables(path, VERSION, verify)
+        assert set(opened) == set(tables)
+        for name, table in tables.items():
+            assert list(opened[name]) == list(table)
+    assert opened["moves"].format == "H"
+
+def test_version_mismatch(table_file):
+    with pytest.raises(ValueError, match="version"):
+        open_tables(table_file[0], VERSION + 1)
+
+def test_format_version_mismatch(table_file):
+    rewrite(table_file[0], 8, (1).to_bytes(4, "little"))
+    with pytest.raises(ValueError, match="format version"):
+        open_tables(table_file[0], VERSION)
+
+def test_foreign_file(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a table file at all, but long enough to have a header")
+    with pytest.raises(ValueError, match="Not a table file"):
+        open_tables(str(path), VERSION)
+
+@pytest.mark.parametrize("missing", [1, 500])
+def test_truncated_tables(table_file, missing):
+    os.truncate(table_file[0], os.path.getsize(table_file[0]) - missing)
+    with pytest.raises(ValueError, match="truncated"):
+        open_tables(table_file[0], VERSION)
+
+@pytest.mark.parametrize("size", [4, HEADER.size - 1, HEADER.size + 10])
+def test_truncated_header(table_file, size):
+    os.truncate(table_file[0], size)
+    with pytest.raises(ValueError, match="truncated"):
+        open_tables(table_file[0], VERSION)
+
+def test_other_byte_order(table_file):
+    other = "big" if sys.byteorder == "little" else "little"
+    rewrite(table_file[0], 20, other.encode().ljust(8, b"\0"))
+    with pytest.raises(ValueError, match="byte order"):
+        open_tables(table_file[0], VERSION)
+
+def test_corruption_is_found_by_verify(table_file):
+    path = table_file[0]
+    rewrite(path, os.path.getsize(path) - 1, b"\xff")
+    open_tables(path, VERSION) # Only the header is checked
+    with pytest.raises(ValueError, match="checksum"):
+        open_tables(path, VERSION, verify=True)
@@ -0,0 +1,40 @@
+""" Tests for the solvability validator """
+
+from facelets import from_facelets
+from rubiks_cube import RubiksCube
+from validation import check_stickers
+
+def scrambled_stickers():
+    cube = RubiksCube()
+    cube.randomize(25, 7)
+    return list(cube.stickers)
+
+def test_reachable_state_is_valid():
+    assert check_stickers(scrambled_stickers()) is None
+
+def test_facelet_string_is_accepted():
+    cube = RubiksCube()
+    cube.apply_algorithm("R U R' U'")
+    assert check_stickers(from_facelets(cube.to_facelets())) is None
+
+def test_twisted_corner():
+    stickers = RubiksCube().stickers
+    (stickers[8], stickers[9], stickers[20]) = (stickers[9], stickers[20], stickers[8]) # URF corner, twisted in place
+    assert "twist" in check_stickers(stickers)
+
+def test_flipped_edge():
+    stickers = RubiksCube().stickers
+    (stickers[5], stickers[10]) = (stickers[10], stickers[5]) # UR edge, flipped in place
+    assert "flipped" in check_stickers(stickers)
+
+def test_swapped_pieces():
+    cube = RubiksCube()
+    stickers = cube.stickers
+    for (first, second) in ((5, 7), (10, 19)): # UR and UF edges swapped
+        (stickers[first], stickers[second]) = (stickers[second], stickers[first])
+    assert "parities" in check_stickers(stickers)
+
+def test_wrong_counts():
+    stickers = RubiksCube().stickers
+    stickers[0] = stickers[13]
+    assert "9 times" in check_stickers(stickers)
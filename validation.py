@@ -0,0 +1,81 @@
+""" Checks that cube states could exist on a real cube, naming the first violation found """
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from cubie import CORNER_LOOKUP, CORNER_STICKERS, EDGE_LOOKUP, EDGE_STICKERS, ORIENTATION_INDEX, face_labels, permutation_parity
+from enums import *
+from facelets import from_facelets
+
+CORNER_NAMES = ("URF", "UFL", "ULB", "UBR", "DFR", "DLF", "DBL", "DRB")
+EDGE_NAMES = ("UR", "UF", "UL", "UB", "DR", "DF", "DL", "DB", "FR", "FL", "BL", "BR")
+CENTERS = range(4, 54, 9)
+
+def check_stickers(stickers):
+    """ Returns None if a sticker array (URFDLB facelet order, see RubiksCube.stickers) is a state a real cube can be
+    turned into, otherwise a description of the first violation found """
+    if len(stickers) != 54:
+        return f"Expected 54 stickers, got {len(stickers)}"
+    counts = Counter(stickers)
+    if any(counts[color] != 9 for color in Color):
+        return "Each color must appear 9 times: " + ", ".join(f"{color.name} {counts[color]}" for color in Color if counts[color] != 9)
+    if tuple(stickers[center] for center in CENTERS) not in ORIENTATION_INDEX:
+        return "Face centers are not arranged as on a real cube"
+    labels = face_labels(stickers)
+    (cp, co, ep, eo) = ([], [], [], [])
+    for position, indices in enumerate(CORNER_STICKERS):
+        piece = CORNER_LOOKUP.get(tuple(labels[index] for index in indices))
+        if piece is None:
+            return f"The {CORNER_NAMES[position]} corner has colors that no corner piece has"
+        if piece[0] in cp:
+            return f"The {CORNER_NAMES[piece[0]]} corner piece appears twice"
+        cp.append(piece[0])
+        co.append(piece[1])
+    for position, indices in enumerate(EDGE_STICKERS):
+        piece = EDGE_LOOKUP.get(tuple(labels[index] for index in indices))
+        if piece is None:
+            return f"The {EDGE_NAMES[position]} edge has colors that no edge piece has"
+        if piece[0] in ep:
+            return f"The {EDGE_NAMES[piece[0]]} edge piece appears twice"
+        ep.append(piece[0])
+        eo.append(piece[1])
+    if sum(co) % 3:
+        return f"Corner twists sum to {sum(co) % 3} (mod 3) instead of 0: a corner is twisted in place"
+    if sum(eo) % 2:
+        return "A single edge is flipped in place"
+    if permutation_parity(cp) != permutation_parity(ep):
+        return "Corner and edge permutation parities differ: two pieces are swapped"
+    return None
+
+def check_states(states):
+    """ Lazily yields check_stickers(state) for each sticker array in states """
+    return map(check_stickers, states)
+
+def main():
+    parser = argparse.ArgumentParser(description="Check cube states, one facelet string per line (see facelets.py), "
+                                                 "and write one JSON result per line")
+    parser.add_argument("input", help="state file, or - for stdin")
+    parser.add_argument("--invalid-only", action="store_true", help="only write results for impossible states")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    (count, invalid) = (0, 0)
+    with sys.stdin if args.input == "-" else open(args.input) as file:
+        for number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                error = check_stickers(from_facelets(line))
+            except ValueError as parse_error:
+                error = str(parse_error)
+            count += 1
+            invalid += error is not None
+            if error is not None or not args.invalid_only:
+                print(json.dumps({"line": number, "valid": error is None, **({"error": error} if error else {})}))
+    elapsed = time.perf_counter() - start
+    print(f"Checked {count} states in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.0f}/s), {invalid} impossible", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()